@@ -88,15 +88,27 @@ class RecipeAdmin(admin.ModelAdmin):
     list_filter = ('tags', 'pub_date',)
     list_editable = ('name', 'cooking_time',)
     filter_horizontal = ('tags',)
-    search_fields = ('name', 'author__username', 'ingredients__name')
+    search_fields = ('=author__username',)
     inlines = (RecipeIngredientInline,)
     fields = ('image',
               ('name', 'author'),
               'text',
               ('tags', 'cooking_time'))
 
+    def get_search_results(self, request, queryset, search_term):
+        found, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        if search_term:
+            found |= queryset.matching(search_term)
+        return found, may_have_duplicates
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        Recipe.objects.filter(pk=form.instance.pk).update_search_vector()
+
     def in_favorite_amount(self, obj):
-        return obj.recipe.count()
+        return obj.favorites_count
 
     in_favorite_amount.short_description = 'В избранном'
 
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.models.signals import pre_migrate
+
+        from api import checks, signals  # noqa: F401
+        from api.middleware import instrument_serializers
+
+        pre_migrate.connect(signals.create_extensions, sender=self)
+        if settings.INSTRUMENTATION:
+            instrument_serializers()
@@ -0,0 +1,241 @@
+import math
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.shortcuts import redirect
+from django.urls import re_path
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from rest_framework import status
+from rest_framework.authentication import get_authorization_header
+from rest_framework.exceptions import APIException, Throttled
+from rest_framework.permissions import AllowAny
+from rest_framework.renderers import JSONRenderer
+
+from api import views
+from api.constants import REFERENCE_CONTENT_KEY, USER_FILTERS
+from api.mixins import finalize_reference_response, get_reference_etag
+from api.models import Ingredient, Recipe, Tag
+from api.permissions import IsAuthorOrReadOnly
+from api.routers import ais_pinned, replica_reads
+from api.serializers import (
+    IngredientSerializer,
+    RecipeGetSerializer,
+    TagSerializer,
+)
+from api.services import (
+    aget_cached_feed,
+    aget_reference_version,
+    aget_user_flags,
+    aresolve_short_link,
+    get_reference_cache,
+    overlay_user_flags,
+)
+from api.throttling import athrottle
+from users.authentication import aget_token_user
+
+
+# Права, которые для GET не обращаются к базе и не зависят от объекта,
+# поэтому их можно проверять прямо в цикле событий.
+ASYNC_SAFE_PERMISSIONS = (AllowAny, IsAuthorOrReadOnly)
+
+
+def read_async(sync_view, read):
+    """
+    GET обрабатывается асинхронно, остальные методы и все случаи,
+    которые быстрый путь не покрывает, уходят в синхронный view.
+    """
+    async def view(request, *args, **kwargs):
+        if request.method == 'GET':
+            user = await authenticate(request)
+            if user is not None:
+                wait = await athrottle(request, user)
+                if wait:
+                    return throttled_response(wait)
+                drf_view = get_read_view(sync_view, request, user, kwargs)
+                if drf_view is not None:
+                    response = await read(request, drf_view, *args, **kwargs)
+                    if response is not None:
+                        return response
+        return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+    view.csrf_exempt = True
+    return view
+
+
+def get_read_view(sync_view, request, user, kwargs):
+    """
+    Экземпляр DRF-представления после тех же проверок прав и выбора
+    формата, что в синхронном пути. None, если ответ не JSON или доступ
+    запрещён: такой запрос обработает синхронный view.
+    """
+    view = sync_view.cls(**sync_view.initkwargs)
+    view.action_map = sync_view.actions
+    for method, action in sync_view.actions.items():
+        setattr(view, method, getattr(view, action))
+    if hasattr(view, 'get') and not hasattr(view, 'head'):
+        view.head = view.get
+    view.args, view.kwargs = (), kwargs
+    view.format_kwarg = view.get_format_suffix(**kwargs)
+    view.request = view.initialize_request(request, **kwargs)
+    view.request.user = user
+    view.headers = view.default_response_headers
+    try:
+        renderer, _ = view.perform_content_negotiation(view.request)
+        view.check_permissions(view.request)
+    except APIException:
+        return None
+    if not isinstance(renderer, JSONRenderer):
+        return None
+    return view
+
+
+def apply_view_headers(response, view) -> HttpResponse:
+    for name, value in view.headers.items():
+        if name == 'Vary':
+            patch_vary_headers(response, (value,))
+        else:
+            response[name] = value
+    return response
+
+
+def json_response(data, view=None) -> HttpResponse:
+    response = HttpResponse(
+        JSONRenderer().render(data), content_type='application/json'
+    )
+    patch_vary_headers(response, ('Accept',))
+    if view is not None:
+        apply_view_headers(response, view)
+    return response
+
+
+def throttled_response(wait) -> HttpResponse:
+    response = json_response({'detail': Throttled(wait).detail})
+    response.status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    response['Retry-After'] = str(math.ceil(wait))
+    return response
+
+
+async def authenticate(request):
+    """Пользователь по токену или None, если токен надо отклонить."""
+    auth = get_authorization_header(request).split()
+    if not auth or auth[0].lower() != b'token':
+        return AnonymousUser()
+    if len(auth) != 2:
+        return None
+    user = await aget_token_user(auth[1].decode(errors='replace'))
+    if user is None or not user.is_active:
+        return None
+    return user
+
+
+async def recipe_list(request, view):
+    user = view.request.user
+    if (
+        user.is_authenticated
+        and any(name in request.GET for name in USER_FILTERS)
+    ):
+        return None
+    data = await aget_cached_feed(request)
+    if data is None:
+        return None
+    if user.is_authenticated:
+        data = overlay_user_flags(data, await aget_user_flags(user))
+    return json_response(data, view)
+
+
+async def recipe_detail(request, view, pk):
+    user = view.request.user
+    with replica_reads(enabled=not await ais_pinned(request, user)):
+        recipe = await Recipe.objects.for_read(user).filter(pk=pk).afirst()
+    if recipe is None or not has_object_permission(view, recipe):
+        return None
+    return json_response(RecipeGetSerializer(
+        recipe, context=view.get_serializer_context()
+    ).data, view)
+
+
+def has_object_permission(view, instance) -> bool:
+    try:
+        view.check_object_permissions(view.request, instance)
+    except APIException:
+        return False
+    return True
+
+
+def reference_list(name):
+    async def read(request, view):
+        if request.GET:
+            return None
+        version, last_modified = await aget_reference_version(name)
+        etag = get_reference_etag(name, version)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            content = await get_reference_cache().aget(
+                REFERENCE_CONTENT_KEY.format(name, version)
+            )
+            if content is None:
+                return None
+            response = apply_view_headers(HttpResponse(
+                content, content_type='application/json'
+            ), view)
+        return finalize_reference_response(response, etag, last_modified)
+    return read
+
+
+def reference_detail(model, serializer_class):
+    async def read(request, view, pk):
+        if not pk.isdigit():
+            return None
+        with replica_reads(enabled=not await ais_pinned(request, None)):
+            instance = await model.objects.filter(pk=pk).afirst()
+        if instance is None or not has_object_permission(view, instance):
+            return None
+        return json_response(serializer_class(instance).data, view)
+    return read
+
+
+async def short_link_redirect(request, code):
+    recipe_id = await aresolve_short_link(code)
+    if recipe_id is None:
+        return await sync_to_async(views.short_link_redirect)(request, code)
+    return redirect(f'/recipes/{recipe_id}/')
+
+
+tag_list = reference_list('tags')
+tag_detail = reference_detail(Tag, TagSerializer)
+ingredient_list = reference_list('ingredients')
+ingredient_detail = reference_detail(Ingredient, IngredientSerializer)
+
+
+ASYNC_READS = {
+    'resipe-list': recipe_list,
+    'resipe-detail': recipe_detail,
+    'tags-list': tag_list,
+    'tags-detail': tag_detail,
+    'ingredients-list': ingredient_list,
+    'ingredients-detail': ingredient_detail,
+}
+
+
+def with_async_reads(urls):
+    for url in urls:
+        if url.name in ASYNC_READS and not all(
+            issubclass(permission, ASYNC_SAFE_PERMISSIONS)
+            for permission in url.callback.cls.permission_classes
+        ):
+            raise ImproperlyConfigured(
+                f'{url.name}: права представления нельзя проверить '
+                'в асинхронном пути'
+            )
+    return [
+        re_path(
+            url.pattern.regex.pattern,
+            read_async(url.callback, ASYNC_READS[url.name]),
+            name=url.name
+        ) if url.name in ASYNC_READS else url
+        for url in urls
+    ]
@@ -0,0 +1,88 @@
+from bisect import bisect_left
+from threading import Lock
+from time import monotonic
+
+from django.contrib.postgres.search import TrigramSimilarity
+
+from api.constants import (
+    INGREDIENT_FUZZY_LIMIT,
+    INGREDIENT_FUZZY_MIN_LENGTH,
+    INGREDIENT_INDEX_TTL,
+)
+from api.models import Ingredient
+from api.routers import replica_reads
+
+
+class IngredientIndex:
+    """Отсортированный индекс названий ингредиентов в памяти процесса.
+
+    Строится при первом обращении, сбрасывается сигналами сохранения и
+    удаления Ingredient и перестраивается не реже раза в
+    INGREDIENT_INDEX_TTL секунд, чтобы подхватить изменения из других
+    процессов.
+    """
+
+    def __init__(self, ttl: int = INGREDIENT_INDEX_TTL) -> None:
+        self.ttl = ttl
+        self._keys = None
+        self._ingredients = None
+        self._built_at = 0.0
+        self._lock = Lock()
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        return name.casefold().replace('ё', 'е')
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._keys = None
+            self._ingredients = None
+
+    def _get_entries(self):
+        with self._lock:
+            if self._keys is None or monotonic() - self._built_at > self.ttl:
+                self._build()
+            return self._keys, self._ingredients
+
+    def _build(self) -> None:
+        with replica_reads(enabled=False):
+            entries = sorted(
+                (
+                    (self.normalize(ingredient['name']), ingredient)
+                    for ingredient in Ingredient.objects.values(
+                        'id', 'name', 'measurement_unit'
+                    ).order_by().iterator()
+                ),
+                key=lambda entry: (entry[0], entry[1]['id'])
+            )
+        self._keys = [key for key, _ in entries]
+        self._ingredients = [ingredient for _, ingredient in entries]
+        self._built_at = monotonic()
+
+    def search(self, term: str) -> list[dict]:
+        term = self.normalize(term)
+        keys, ingredients = self._get_entries()
+        start = bisect_left(keys, term)
+        end = start
+        while end < len(keys) and keys[end].startswith(term):
+            end += 1
+        found = ingredients[start:end]
+        found.extend(
+            ingredients[index] for index, key in enumerate(keys)
+            if term in key and not start <= index < end
+        )
+        if not found and len(term) >= INGREDIENT_FUZZY_MIN_LENGTH:
+            found = self.fuzzy_search(term)
+        return found
+
+    def fuzzy_search(self, term: str) -> list[dict]:
+        return list(
+            Ingredient.objects.filter(name__trigram_similar=term).annotate(
+                similarity=TrigramSimilarity('name', term)
+            ).order_by('-similarity').values(
+                'id', 'name', 'measurement_unit'
+            )[:INGREDIENT_FUZZY_LIMIT]
+        )
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+
+class LRUCache:
+    """Потокобезопасный LRU-кэш ограниченного размера в памяти процесса.
+
+    Если задан ttl, записи старше ttl секунд считаются отсутствующими.
+    """
+
+    def __init__(self, maxsize: int, ttl: int | None = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            value, expires_at = self._data[key]
+            if expires_at is not None and expires_at < monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        expires_at = None if self.ttl is None else monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class CachedValue:
+    """Лениво загружаемое значение с временем жизни и ручным сбросом."""
+
+    def __init__(self, load, ttl: int) -> None:
+        self.load = load
+        self.ttl = ttl
+        self._value = None
+        self._loaded_at = None
+        self._lock = Lock()
+
+    def get(self):
+        with self._lock:
+            if (
+                self._loaded_at is None
+                or monotonic() - self._loaded_at > self.ttl
+            ):
+                self._value = self.load()
+                self._loaded_at = monotonic()
+            return self._value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = None
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+from rest_framework.settings import api_settings
+
+from api.constants import PROCESS_CACHE_BACKENDS
+
+
+def get_connection_messages(databases, async_views):
+    """Постоянные соединения несовместимы с пулом и с ASGI."""
+    messages = []
+    for alias, database in databases.items():
+        if not database.get('CONN_MAX_AGE'):
+            continue
+        if 'pool' in database.get('OPTIONS', {}):
+            messages.append(Error(
+                f'База {alias}: пул соединений требует CONN_MAX_AGE = 0.',
+                hint='Уберите DB_CONN_MAX_AGE при DB_POOL=True.',
+                id='api.E001',
+            ))
+        elif async_views:
+            messages.append(Error(
+                f'База {alias}: под ASGI постоянные соединения утекают.',
+                hint='Задайте CONN_MAX_AGE = 0 и включите DB_POOL=True.',
+                id='api.E002',
+            ))
+    if async_views and 'pool' not in databases['default'].get('OPTIONS', {}):
+        messages.append(Warning(
+            'Под ASGI соединение с базой открывается на каждый запрос.',
+            hint='Включите пул соединений: DB_POOL=True.',
+            id='api.W001',
+        ))
+    return messages
+
+
+@register()
+def check_persistent_connections(app_configs, **kwargs):
+    return get_connection_messages(settings.DATABASES, settings.ASYNC_VIEWS)
+
+
+def get_throttle_messages(cache, rates, debug):
+    """Лимиты должны считаться в кэше, общем для всех воркеров."""
+    if debug or not any(rates.values()) or (
+        cache['BACKEND'] not in PROCESS_CACHE_BACKENDS
+    ):
+        return []
+    return [Error(
+        'Кэш троттлинга живёт в памяти процесса: лимиты умножаются на '
+        'число воркеров и сбрасываются при перезапуске.',
+        hint='Задайте общий THROTTLE_CACHE_BACKEND.',
+        id='api.E003',
+    )]
+
+
+@register()
+def check_throttle_cache(app_configs, **kwargs):
+    return get_throttle_messages(
+        settings.CACHES[settings.THROTTLE_CACHE],
+        api_settings.DEFAULT_THROTTLE_RATES,
+        settings.DEBUG
+    )
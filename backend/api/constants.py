@@ -6,7 +6,93 @@ MAX_COOKING_TIME: int = 32_000
 MIN_INGREDIENT_AMOUNT: int = 1
 MAX_INGREDIENT_AMOUNT: int = 32_000
 TEXT_FIELD_LENGTH: int = 255
-MIN_COLUMNS: int = 2
+IMPORT_BATCH_SIZE: int = 5000
+IMPORT_READ_SIZE: int = 64 * 1024
+SEARCH_CONFIG: str = 'russian'
+IMAGE_RENDITIONS = {
+    'thumbnail': 300,
+    'medium': 800,
+    'full': 2048,
+}
+IMAGE_FORMAT: str = 'WEBP'
+IMAGE_EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+IMAGE_QUALITY: int = 85
+IMAGE_SPOOL_SIZE: int = 1024 * 1024
+BASE64_CHUNK_SIZE: int = 4 * 64 * 1024
+RENDITIONS_SUFFIX: str = '_renditions'
+MEDIA_GC_GRACE: int = 60 * 60
+IMAGE_TASK_MAX_ATTEMPTS: int = 3
+IMAGE_WORKER_BATCH: int = 10
+IMAGE_WORKER_SLEEP: int = 2
+MODEL_LABEL_LENGTH: int = 100
+FIELD_NAME_LENGTH: int = 50
+INGREDIENT_INDEX_TTL: int = 300
+TAG_CACHE_TTL: int = 300
+TAGS_MATCH_CHOICES = (('any', 'any'), ('all', 'all'))
+INGREDIENT_FUZZY_LIMIT: int = 10
+INGREDIENT_FUZZY_MIN_LENGTH: int = 3
+CURSOR_SEPARATOR: str = '|'
+INVALID_CURSOR_MESSAGE: str = 'Неверный курсор.'
+SHORT_LINK_LENGTH: int = 20
+REFERENCE_VERSION_KEY: str = 'reference-version:{}'
+FEED_CACHE_KEY: str = 'feed:{}:{}'
+FEED_CACHE_TIMEOUT: int = 60
+FEED_AUTHOR_FIELDS = frozenset(
+    ('email', 'username', 'first_name', 'last_name', 'avatar')
+)
+USER_FLAGS_KEY: str = 'user-flags:{}'
+USER_FLAGS_TIMEOUT: int = 30
+USER_FILTERS = ('is_favorited', 'is_in_shopping_cart')
+REFERENCE_CONTENT_TIMEOUT: int = 60 * 60 * 24
+REFERENCE_CONTENT_KEY: str = 'reference-content:{}:{}'
+SHORT_LINK_ALPHABET: str = (
+    '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+)
+SHORT_LINK_CACHE_SIZE: int = 10_000
+SHORT_LINK_CACHE_KEY: str = 'short-link:{}'
+SHOPPING_LIST_CHUNK_SIZE: int = 500
+SHOPPING_LIST_TITLE: str = 'Список покупок'
+SHOPPING_LIST_FIELDS = ('name', 'total', 'unit')
+SEED_PREFIX: str = 'seed'
+SEED_PASSWORD: str = 'seed-password'
+SEED_BATCH_SIZE: int = 1000
+SEED_ZIPF_EXPONENT: float = 1.1
+SEED_PARETO_ALPHA: float = 1.2
+SEED_INGREDIENTS_RANGE = (3, 12)
+SEED_TAGS_RANGE = (1, 3)
+SEED_AMOUNT_RANGE = (1, 500)
+SEED_COOKING_TIME_RANGE = (5, 180)
+SEED_PUB_DATE_STEP: int = 17
+BENCHMARK_REPEAT: int = 20
+BENCHMARK_WARMUP: int = 2
+BENCHMARK_SERVER_REQUESTS: int = 200
+BENCHMARK_SERVER_CONCURRENCY: int = 16
+BENCHMARK_SERVER_START_TIMEOUT: int = 30
+INSTRUMENTATION_WINDOW: int = 1000
+INSTRUMENTATION_PERCENTILES = (50, 95, 99)
+INSTRUMENTATION_REPEAT_THRESHOLD: int = 5
+REPLICA_DATABASE: str = 'replica'
+REPLICA_PIN_COOKIE: str = 'primary_pin'
+REPLICA_PIN_KEY: str = 'primary-pin:{}'
+THROTTLE_KEY: str = 'throttle:{scope}:{ident}'
+THROTTLE_PAGE_STEP: int = 10
+PROCESS_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+RECIPE_THROTTLE_COSTS = {
+    'create': 10,
+    'update': 10,
+    'partial_update': 10,
+    'download_shopping_cart': 20,
+    'get_link': 5,
+}
+USER_THROTTLE_COSTS = {
+    'create': 10,
+    'set_password': 10,
+    'upload_avatar': 10,
+    'subscriptions': 2,
+}
 
 RECIPE_VALIDATION_MESSAGES = {
     'EMPTY': {
@@ -17,6 +103,10 @@ RECIPE_VALIDATION_MESSAGES = {
         'ingredients': 'Ингридиенты не могут повторяться!',
         'tags': 'Тэги не могут повторяться!'
     },
+    'NOT_FOUND': {
+        'ingredients': 'Ингредиенты не найдены: {}',
+        'tags': 'Тэги не найдены: {}'
+    },
 }
 
 MESSAGES = {
@@ -1,17 +1,40 @@
+from django import forms
+from django.db.models import Count, Exists, OuterRef
 from django_filters.rest_framework import filters, FilterSet
 
+from api.caches import CachedValue
+from api.constants import TAG_CACHE_TTL, TAGS_MATCH_CHOICES
 from api.models import Ingredient, Recipe, Tag
+from api.routers import replica_reads
+
+
+def load_tag_ids():
+    with replica_reads(enabled=False):
+        return dict(Tag.objects.values_list('slug', 'id'))
+
+
+tag_ids = CachedValue(load_tag_ids, ttl=TAG_CACHE_TTL)
+
+
+class MultipleValueField(forms.Field):
+    widget = forms.SelectMultiple
+
+    def to_python(self, value):
+        return list(dict.fromkeys(value or ()))
+
+
+class MultipleValueFilter(filters.Filter):
+    field_class = MultipleValueField
 
 
 class RecipeFilter(FilterSet):
     author = filters.CharFilter(
         field_name='author__id'
     )
-    tags = filters.ModelMultipleChoiceFilter(
-        field_name='tags__slug',
-        queryset=Tag.objects.all(),
-        to_field_name='slug',
-        conjoined=False
+    tags = MultipleValueFilter(method='get_tags')
+    tags_match = filters.ChoiceFilter(
+        choices=TAGS_MATCH_CHOICES,
+        method='get_tags_match'
     )
     is_favorited = filters.BooleanFilter(
         method='get_is_favorited'
@@ -19,11 +42,32 @@ class RecipeFilter(FilterSet):
     is_in_shopping_cart = filters.BooleanFilter(
         method='get_is_in_shopping_cart'
     )
+    search = filters.CharFilter(method='get_search')
 
     class Meta:
         model = Recipe
         fields = ('name',)
 
+    def get_tags(self, queryset, name, value):
+        if not value:
+            return queryset
+        known = tag_ids.get()
+        ids = [known[slug] for slug in value if slug in known]
+        match_all = self.form.cleaned_data.get('tags_match') == 'all'
+        if not ids or (match_all and len(ids) < len(value)):
+            return queryset.none()
+        through = Recipe.tags.through.objects.filter(
+            recipe=OuterRef('pk'), tag_id__in=ids
+        )
+        if match_all:
+            through = through.values('recipe').annotate(
+                matched=Count('tag_id')
+            ).filter(matched=len(ids))
+        return queryset.filter(Exists(through))
+
+    def get_tags_match(self, queryset, name, value):
+        return queryset
+
     def get_is_favorited(self, queryset, name, value):
         if self.request.user.is_authenticated and value:
             return queryset.filter(recipe__user=self.request.user)
@@ -34,6 +78,9 @@ class RecipeFilter(FilterSet):
             return queryset.filter(shoping_list__user=self.request.user)
         return queryset
 
+    def get_search(self, queryset, name, value):
+        return queryset.search(value) if value else queryset
+
 
 class IngredientFilter(FilterSet):
     name = filters.CharFilter(lookup_expr='istartswith')
@@ -0,0 +1,88 @@
+import base64
+import binascii
+import os
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from api.constants import (
+    BASE64_CHUNK_SIZE,
+    IMAGE_EXTENSIONS,
+    IMAGE_FORMAT,
+    IMAGE_QUALITY,
+    IMAGE_RENDITIONS,
+    IMAGE_SPOOL_SIZE,
+    RENDITIONS_SUFFIX,
+)
+from api.models import ImageTask
+from api.services import bump_reference_version
+
+
+def decode_base64_file(encoded: str, name: str) -> File:
+    file = SpooledTemporaryFile(max_size=IMAGE_SPOOL_SIZE)
+    try:
+        for start in range(0, len(encoded), BASE64_CHUNK_SIZE):
+            file.write(base64.b64decode(
+                encoded[start:start + BASE64_CHUNK_SIZE], validate=True
+            ))
+    except (binascii.Error, ValueError):
+        file.close()
+        raise
+    file.seek(0)
+    return File(file, name=name)
+
+
+def make_renditions(field_file) -> dict[str, str]:
+    with field_file.open('rb') as source:
+        image = Image.open(source)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+    image = image.convert(
+        'RGBA' if has_alpha and IMAGE_FORMAT != 'JPEG' else 'RGB'
+    )
+    stem = os.path.splitext(os.path.basename(field_file.name))[0]
+    renditions = {'source': field_file.name}
+    for rendition, size in IMAGE_RENDITIONS.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        buffer = BytesIO()
+        resized.save(buffer, IMAGE_FORMAT, quality=IMAGE_QUALITY)
+        renditions[rendition] = field_file.storage.save(
+            field_file.field.generate_filename(
+                field_file.instance,
+                f'{stem}_{rendition}.{IMAGE_EXTENSIONS[IMAGE_FORMAT]}'
+            ),
+            ContentFile(buffer.getvalue())
+        )
+    return renditions
+
+
+def enqueue_image(instance, field_name: str) -> None:
+    field_file = getattr(instance, field_name)
+    renditions = getattr(instance, field_name + RENDITIONS_SUFFIX)
+    if field_file and renditions.get('source') != field_file.name:
+        ImageTask.objects.update_or_create(
+            model_label=instance._meta.label_lower,
+            object_id=instance.pk,
+            field_name=field_name,
+            defaults={'attempts': 0, 'error': ''}
+        )
+
+
+def process_image_task(task) -> None:
+    model = apps.get_model(task.model_label)
+    instance = model.objects.filter(pk=task.object_id).first()
+    field_file = getattr(instance, task.field_name, None)
+    if not field_file:
+        return
+    model.objects.filter(
+        pk=instance.pk, **{task.field_name: field_file.name}
+    ).update(**{
+        task.field_name + RENDITIONS_SUFFIX: make_renditions(field_file)
+    })
+    bump_reference_version('recipes')
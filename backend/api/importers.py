@@ -0,0 +1,207 @@
+import csv
+import io
+import json
+from itertools import islice
+from pathlib import Path
+
+from django.db import connection, transaction
+
+from api.constants import IMPORT_READ_SIZE
+from api.models import Ingredient, Tag
+
+
+class Importer:
+    """Потоковый upsert справочника по уникальному ключу."""
+
+    def __init__(self, model, key, fields):
+        self.model = model
+        self.key = key
+        self.fields = fields
+        self.updated_fields = tuple(
+            field for field in fields if field != key
+        )
+        self.inserted = self.updated = self.skipped = 0
+
+    def clean(self, row):
+        if not isinstance(row, dict):
+            return None
+        values = {}
+        for name in self.fields:
+            value = str(row.get(name) or '').strip()
+            max_length = self.model._meta.get_field(name).max_length
+            if not value or len(value) > max_length:
+                return None
+            values[name] = value
+        return values
+
+    def unique(self, rows):
+        batch = {}
+        for row in rows:
+            values = self.clean(row)
+            if values is None:
+                self.skipped += 1
+                continue
+            if values[self.key] in batch:
+                self.skipped += 1
+            batch[values[self.key]] = values
+        return batch
+
+    def upsert(self, rows):
+        batch = self.unique(rows)
+        existing = {
+            values[self.key]: values
+            for values in self.model.objects.filter(
+                **{f'{self.key}__in': batch}
+            ).values(*self.fields)
+        }
+        changed = []
+        for key, values in batch.items():
+            if existing.get(key) == values:
+                self.skipped += 1
+                continue
+            if key in existing:
+                self.updated += 1
+            else:
+                self.inserted += 1
+            changed.append(self.model(**values))
+        self.model.objects.bulk_create(
+            changed,
+            update_conflicts=True,
+            unique_fields=(self.key,),
+            update_fields=self.updated_fields
+        )
+
+    def copy(self, batches):
+        table = self.model._meta.db_table
+        staging = f'{table}_import'
+        columns = ', '.join(self.fields)
+        definitions = ', '.join(f'{field} text' for field in self.fields)
+        updates = ', '.join(
+            f'{field} = EXCLUDED.{field}' for field in self.updated_fields
+        )
+        distinct = ' OR '.join(
+            f'{table}.{field} IS DISTINCT FROM EXCLUDED.{field}'
+            for field in self.updated_fields
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMP TABLE {staging} '
+                f'(position serial, {definitions}) '
+                'ON COMMIT DROP'
+            )
+            for batch in batches:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(
+                    [values[field] for field in self.fields]
+                    for values in self.unique(batch).values()
+                )
+                buffer.seek(0)
+                copy_from(
+                    cursor.cursor,
+                    f'COPY {staging} ({columns}) FROM STDIN WITH CSV',
+                    buffer
+                )
+            cursor.execute(f'SELECT count(*) FROM {staging}')
+            staged = cursor.fetchone()[0]
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) '
+                f'SELECT DISTINCT ON ({self.key}) {columns} FROM {staging} '
+                f'ORDER BY {self.key}, position DESC '
+                f'ON CONFLICT ({self.key}) DO UPDATE SET {updates} '
+                f'WHERE {distinct} '
+                'RETURNING xmax = 0'
+            )
+            results = [inserted for inserted, in cursor.fetchall()]
+            # ON COMMIT DROP срабатывает только на внешней транзакции, а
+            # повторный импорт внутри неё создаёт таблицу заново.
+            cursor.execute(f'DROP TABLE {staging}')
+        self.inserted += sum(results)
+        self.updated += len(results) - sum(results)
+        self.skipped += staged - len(results)
+
+
+IMPORTERS = {
+    'ingredients': lambda: Importer(
+        Ingredient, 'name', ('name', 'measurement_unit')
+    ),
+    'tags': lambda: Importer(Tag, 'slug', ('name', 'slug')),
+}
+
+
+def copy_from(cursor, sql, file):
+    if hasattr(cursor, 'copy_expert'):
+        cursor.copy_expert(sql, file)
+        return
+    with cursor.copy(sql) as copy:
+        while data := file.read(IMPORT_READ_SIZE):
+            copy.write(data)
+
+
+def read_csv(file, fields):
+    for row in csv.reader(file):
+        yield dict(zip(fields, row))
+
+
+def read_json_lines(file, fields):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_json(file, fields):
+    """Читает JSON-массив объектов по частям, не загружая файл целиком."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    while True:
+        chunk = file.read(IMPORT_READ_SIZE)
+        buffer += chunk
+        position = 0
+        while True:
+            while position < len(buffer) and (
+                buffer[position] in ' \t\r\n,'
+                or (buffer[position] == '[' and not started)
+            ):
+                started = started or buffer[position] == '['
+                position += 1
+            if position == len(buffer):
+                break
+            if buffer[position] == ']':
+                return
+            try:
+                row, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if not chunk:
+                    raise
+                break
+            yield row
+        buffer = buffer[position:]
+        if not chunk:
+            return
+
+
+READERS = {
+    '.csv': read_csv,
+    '.json': read_json,
+    '.jsonl': read_json_lines,
+}
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def import_file(name, path, batch_size, use_copy=False, file_format=None):
+    importer = IMPORTERS[name]()
+    reader = READERS[file_format or Path(path).suffix.lower()]
+    with open(path, encoding='utf-8', newline='') as file:
+        batches = batched(reader(file, importer.fields), batch_size)
+        if use_copy:
+            importer.copy(batches)
+        else:
+            for batch in batches:
+                with transaction.atomic():
+                    importer.upsert(batch)
+    return importer
@@ -0,0 +1,162 @@
+import json
+import math
+import statistics
+import tracemalloc
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.constants import BENCHMARK_REPEAT, BENCHMARK_WARMUP
+from api.models import Ingredient, Recipe, Tag
+from users.models import User
+
+
+def get_endpoints():
+    user = User.objects.order_by('-recipes_count', 'pk').first()
+    recipe = Recipe.objects.order_by('-favorites_count', 'pk').first()
+    tag = Tag.objects.order_by('pk').first()
+    ingredient = Ingredient.objects.order_by('pk').first()
+    if None in (user, recipe, tag, ingredient):
+        raise CommandError('Нет данных: выполните seed_data')
+    recipes = reverse('api:resipe-list')
+    return user, (
+        ('anonymous', 'recipes', recipes),
+        ('anonymous', 'recipes:tags', f'{recipes}?tags={tag.slug}'),
+        ('anonymous', 'recipes:search', f'{recipes}?search={recipe.name}'),
+        ('user', 'recipes', recipes),
+        ('user', 'recipes:favorited', f'{recipes}?is_favorited=1'),
+        ('user', 'recipes:cart', f'{recipes}?is_in_shopping_cart=1'),
+        ('user', 'recipes:author', f'{recipes}?author={user.pk}'),
+        ('user', 'recipe', reverse(
+            'api:resipe-detail', args=(recipe.pk,)
+        )),
+        ('user', 'recipe:link', reverse(
+            'api:resipe-get-link', args=(recipe.pk,)
+        )),
+        ('user', 'shopping_cart', reverse(
+            'api:resipe-download-shopping-cart'
+        )),
+        ('anonymous', 'tags', reverse('api:tags-list')),
+        ('anonymous', 'tag', reverse('api:tags-detail', args=(tag.pk,))),
+        ('anonymous', 'ingredients', reverse('api:ingredients-list')),
+        ('anonymous', 'ingredients:name', (
+            f'{reverse("api:ingredients-list")}'
+            f'?name={ingredient.name[:3]}'
+        )),
+        ('user', 'users', reverse('api:users-list')),
+        ('user', 'user', reverse('api:users-detail', args=(user.pk,))),
+        ('user', 'users:me', reverse('api:users-current_user')),
+        ('user', 'users:subscriptions', (
+            f'{reverse("api:users-get_subscriptions")}?recipes_limit=3'
+        )),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет задержку, число запросов к БД и выделения памяти '
+        'для эндпоинтов API и сохраняет результат в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='benchmark.json')
+        parser.add_argument('--compare', help='JSON прошлого запуска')
+        parser.add_argument('--label', default='')
+        parser.add_argument('--repeat', type=int, default=BENCHMARK_REPEAT)
+        parser.add_argument('--warmup', type=int, default=BENCHMARK_WARMUP)
+
+    def get(self, client, url):
+        response = client.get(url)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def measure(self, client, url, repeat, warmup):
+        for _ in range(warmup):
+            self.get(client, url)
+        timings, queries, statuses = [], [], []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as context:
+                started = perf_counter()
+                response = self.get(client, url)
+                timings.append((perf_counter() - started) * 1000)
+            queries.append(len(context))
+            statuses.append(response.status_code)
+        tracemalloc.start()
+        self.get(client, url)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        timings.sort()
+        return {
+            'status': response.status_code,
+            'failed': sum(not 200 <= status < 300 for status in statuses),
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[math.ceil(len(timings) * 0.95) - 1], 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'queries': max(queries),
+            'peak_kb': round(peak / 1024, 1),
+        }
+
+    def compare(self, results, path):
+        with open(path) as file:
+            previous = json.load(file)['results']
+        for name, result in results.items():
+            if name not in previous:
+                continue
+            before = previous[name]
+            self.stdout.write(
+                f'{name}: p50 {before["p50_ms"]} -> {result["p50_ms"]} мс, '
+                f'запросов {before["queries"]} -> {result["queries"]}, '
+                f'память {before["peak_kb"]} -> {result["peak_kb"]} КБ'
+            )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat должен быть больше нуля')
+        setup_test_environment()
+        # Иначе сотни запросов подряд упрутся в троттлинг и в замеры
+        # попадут ответы 429.
+        unthrottled = override_settings(REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {'anon': None, 'user': None},
+        })
+        unthrottled.enable()
+        try:
+            user, endpoints = get_endpoints()
+            clients = {'anonymous': APIClient(), 'user': APIClient()}
+            clients['user'].force_authenticate(user)
+            results = {}
+            for role, name, url in endpoints:
+                key = f'{role}:{name}'
+                results[key] = self.measure(
+                    clients[role], url, options['repeat'], options['warmup']
+                )
+                self.stdout.write(f'{key}: {results[key]}')
+        finally:
+            unthrottled.disable()
+            teardown_test_environment()
+        with open(options['output'], 'w') as file:
+            json.dump(
+                {'label': options['label'], 'results': results},
+                file, ensure_ascii=False, indent=2
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Результаты сохранены в {options["output"]}'
+        ))
+        if options['compare']:
+            self.compare(results, options['compare'])
+        failed = [name for name, result in results.items() if result['failed']]
+        if failed:
+            raise CommandError(
+                f'Ответы не 2xx, замеры недостоверны: {", ".join(failed)}'
+            )
@@ -0,0 +1,137 @@
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, perf_counter, sleep
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from api.constants import (
+    BENCHMARK_SERVER_CONCURRENCY,
+    BENCHMARK_SERVER_REQUESTS,
+    BENCHMARK_SERVER_START_TIMEOUT,
+)
+from api.management.commands.benchmark import get_endpoints
+
+MODES = {
+    'wsgi': ('False', ('backend.wsgi',)),
+    'asgi': ('True', ('-k', 'uvicorn.workers.UvicornWorker', 'backend.asgi')),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает gunicorn в режимах WSGI и ASGI с одинаковым числом '
+        'воркеров и сравнивает задержку и пропускную способность'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument(
+            '--concurrency', type=int, default=BENCHMARK_SERVER_CONCURRENCY
+        )
+        parser.add_argument(
+            '--requests', type=int, default=BENCHMARK_SERVER_REQUESTS
+        )
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument(
+            '--modes', nargs='+', choices=MODES, default=tuple(MODES)
+        )
+        parser.add_argument('--output', default='benchmark-servers.json')
+
+    def start_server(self, mode, workers, port):
+        flag, arguments = MODES[mode]
+        server = subprocess.Popen(
+            (
+                sys.executable, '-m', 'gunicorn',
+                '--workers', str(workers),
+                '--bind', f'127.0.0.1:{port}',
+                *arguments
+            ),
+            cwd=settings.BASE_DIR,
+            env={
+                **os.environ,
+                'ASGI': flag,
+                'THROTTLE_ANON_RATE': '',
+                'THROTTLE_USER_RATE': '',
+            },
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        deadline = monotonic() + BENCHMARK_SERVER_START_TIMEOUT
+        while monotonic() < deadline:
+            if server.poll() is not None:
+                break
+            try:
+                requests.get(f'http://127.0.0.1:{port}/api/tags/', timeout=1)
+                return server
+            except requests.ConnectionError:
+                sleep(0.2)
+        server.kill()
+        raise CommandError(f'{mode}: сервер не запустился')
+
+    def load(self, url, headers, total, concurrency):
+        local = threading.local()
+
+        def fetch(_):
+            if not hasattr(local, 'session'):
+                local.session = requests.Session()
+            started = perf_counter()
+            response = local.session.get(url, headers=headers)
+            return (perf_counter() - started) * 1000, response.status_code
+
+        started = perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            results = list(executor.map(fetch, range(total)))
+        elapsed = perf_counter() - started
+        timings = sorted(timing for timing, _ in results)
+        return {
+            'status': sorted({status for _, status in results}),
+            'rps': round(total / elapsed, 1),
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[math.ceil(len(timings) * 0.95) - 1], 3),
+        }
+
+    def handle(self, *args, **options):
+        user, endpoints = get_endpoints()
+        token, _ = Token.objects.get_or_create(user=user)
+        headers = {
+            'anonymous': {},
+            'user': {'Authorization': f'Token {token.key}'},
+        }
+        results = {}
+        for mode in options['modes']:
+            server = self.start_server(
+                mode, options['workers'], options['port']
+            )
+            try:
+                results[mode] = {}
+                for role, name, path in endpoints:
+                    key = f'{role}:{name}'
+                    results[mode][key] = self.load(
+                        f'http://127.0.0.1:{options["port"]}{path}',
+                        headers[role],
+                        options['requests'],
+                        options['concurrency']
+                    )
+                    self.stdout.write(f'{mode} {key}: {results[mode][key]}')
+            finally:
+                server.terminate()
+                server.wait()
+        with open(options['output'], 'w') as file:
+            json.dump(
+                {'workers': options['workers'],
+                 'concurrency': options['concurrency'],
+                 'results': results},
+                file, ensure_ascii=False, indent=2
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Результаты сохранены в {options["output"]}'
+        ))
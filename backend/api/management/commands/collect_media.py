@@ -0,0 +1,54 @@
+import os
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.constants import MEDIA_GC_GRACE
+from api.storage import count_references, get_file_fields
+
+
+class Command(BaseCommand):
+    help = 'Удаляет файлы медиа, на которые не ссылается ни один объект'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, какие файлы будут удалены'
+        )
+
+    def handle(self, *args, **kwargs):
+        references = count_references()
+        threshold = timezone.now() - timedelta(seconds=MEDIA_GC_GRACE)
+        directories = {
+            field.upload_to for _, field in get_file_fields()
+            if isinstance(field.upload_to, str)
+        }
+        removed = kept = 0
+        for directory in sorted(directories):
+            for name in self.walk(directory):
+                if (
+                    references[name]
+                    or default_storage.get_modified_time(name) > threshold
+                ):
+                    kept += 1
+                    continue
+                removed += 1
+                if kwargs['dry_run']:
+                    self.stdout.write(name)
+                else:
+                    default_storage.purge(name)
+        self.stdout.write(self.style.SUCCESS(
+            f'Используется файлов: {kept}, удалено: {removed}'
+        ))
+
+    def walk(self, directory):
+        if not default_storage.exists(directory):
+            return
+        subdirectories, files = default_storage.listdir(directory)
+        for filename in files:
+            yield os.path.join(directory, filename)
+        for subdirectory in subdirectories:
+            yield from self.walk(os.path.join(directory, subdirectory))
@@ -0,0 +1,137 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory
+
+from api.filters import RecipeFilter, tag_ids
+from api.models import Recipe, Tag
+from api.services import get_shopping_list
+from users.models import User
+from users.views import UsersViewSet
+
+SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет EXPLAIN основных запросов API и сообщает '
+        'о последовательном сканировании таблиц'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            help='id пользователя, от имени которого строятся запросы'
+        )
+        parser.add_argument(
+            '--allow',
+            nargs='*',
+            default=(),
+            help='Таблицы, для которых последовательное сканирование допустимо'
+        )
+
+    def make_request(self, user, params=None):
+        request = Request(APIRequestFactory().get('/', params))
+        request.user = user
+        return request
+
+    def filtered(self, user, params):
+        request = self.make_request(user, params)
+        return RecipeFilter(
+            request.query_params,
+            queryset=Recipe.objects.for_read(user),
+            request=request
+        ).qs
+
+    def get_scenarios(self, user):
+        limit = api_settings.PAGE_SIZE
+        recipe = Recipe.objects.order_by('pk').first()
+        slugs = list(Tag.objects.values_list('slug', flat=True)[:2])
+        view = UsersViewSet(request=self.make_request(user))
+        return (
+            ('лента', lambda: list(
+                Recipe.objects.for_read(user)[:limit]
+            )),
+            ('рецепт', lambda: list(
+                Recipe.objects.for_read(user).filter(pk=recipe.pk)
+            )),
+            ('рецепты автора', lambda: list(
+                self.filtered(user, {'author': recipe.author_id})[:limit]
+            )),
+            ('теги', lambda: list(
+                self.filtered(user, {'tags': slugs})[:limit]
+            )),
+            ('все теги', lambda: list(
+                self.filtered(
+                    user, {'tags': slugs, 'tags_match': 'all'}
+                )[:limit]
+            )),
+            ('избранное', lambda: list(
+                self.filtered(user, {'is_favorited': 1})[:limit]
+            )),
+            ('корзина', lambda: list(
+                self.filtered(user, {'is_in_shopping_cart': 1})[:limit]
+            )),
+            ('поиск', lambda: list(
+                self.filtered(user, {'search': recipe.name})[:limit]
+            )),
+            ('список покупок', lambda: list(get_shopping_list(user))),
+            ('подписки', lambda: list(
+                view.get_subscriptions_queryset(limit)[:limit]
+            )),
+        )
+
+    def warm_caches(self):
+        # Справочник тегов целиком читается в кэш процесса: это
+        # сканирование сделано намеренно и к горячим запросам не относится.
+        tag_ids.get()
+
+    def explain(self, sql):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}')
+            return '\n'.join(row[0] for row in cursor.fetchall())
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        if options['user']:
+            users = users.filter(pk=options['user'])
+        user = users.filter(shoping_list__isnull=False).first() or (
+            users.first()
+        )
+        if user is None or not Recipe.objects.exists():
+            raise CommandError('Нет данных: заполните базу перед проверкой')
+        self.warm_caches()
+        failed = []
+        for label, run in self.get_scenarios(user):
+            with CaptureQueriesContext(connection) as context:
+                run()
+            tables = set()
+            for query in context.captured_queries:
+                if not query['sql'].startswith('SELECT'):
+                    continue
+                plan = self.explain(query['sql'])
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'{query["sql"]}\n{plan}\n')
+                tables.update(
+                    table for table in SEQ_SCAN.findall(plan)
+                    if table not in options['allow']
+                )
+            if tables:
+                failed.append(label)
+                self.stdout.write(self.style.ERROR(
+                    f'{label}: Seq Scan on {", ".join(sorted(tables))}'
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f'{label}: {len(context)} запросов, индексы используются'
+                ))
+        if failed:
+            raise CommandError(
+                f'Последовательное сканирование: {", ".join(failed)}'
+            )
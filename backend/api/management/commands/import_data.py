@@ -1,59 +1,68 @@
-import csv
+from django.core.management.base import BaseCommand, CommandError
 
-from django.core.management.base import BaseCommand
-
-from api.models import Ingredient, Tag
-from api.constants import MIN_COLUMNS
+from api.autocomplete import ingredient_index
+from api.constants import IMPORT_BATCH_SIZE
+from api.filters import tag_ids
+from api.importers import READERS, import_file
+from api.services import bump_reference_version
 
 
 class Command(BaseCommand):
-    help = 'Импортирует данные из CSV файлов для ингредиентов и тегов'
+    help = (
+        'Импортирует ингредиенты и теги из CSV, JSON или JSON Lines '
+        'с обновлением существующих записей'
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
             '--ingredients',
             type=str,
-            help='Путь к CSV-файлу с ингредиентами'
+            help='Путь к файлу с ингредиентами'
         )
         parser.add_argument(
             '--tags',
             type=str,
-            help='Путь к CSV-файлу с тегами'
+            help='Путь к файлу с тегами'
+        )
+        parser.add_argument(
+            '--format',
+            choices=[extension[1:] for extension in READERS],
+            help='Формат файлов, по умолчанию определяется по расширению'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help='Размер пакета строк'
+        )
+        parser.add_argument(
+            '--copy',
+            action='store_true',
+            help='Загружать через COPY во временную таблицу'
         )
 
     def handle(self, *args, **kwargs):
-        ingredients_file = kwargs['ingredients']
-        tags_file = kwargs['tags']
-
-        if ingredients_file:
-            ingredients = []
-            with open(ingredients_file, 'r') as file:
-                reader = csv.reader(file)
-                for row in reader:
-                    if len(row) >= MIN_COLUMNS:
-                        name, measurement_unit = row
-                        if name:
-                            ingredients.append(Ingredient(
-                                name=name,
-                                measurement_unit=measurement_unit
-                            ))
-            Ingredient.objects.bulk_create(ingredients, ignore_conflicts=True)
-            self.stdout.write(
-                self.style.SUCCESS('Ингредиенты успешно импортированы!')
-            )
-
-        if tags_file:
-            tags = []
-            with open(tags_file, 'r') as file:
-                reader = csv.reader(file)
-                for row in reader:
-                    if len(row) >= MIN_COLUMNS:
-                        name, slug = row
-                        if name:
-                            tags.append(Tag(name=name, slug=slug))
-            Tag.objects.bulk_create(tags, ignore_conflicts=True)
-            self.stdout.write(
-                self.style.SUCCESS('Теги успешно импортированы!')
-            )
-
-        self.stdout.write(self.style.SUCCESS('Данные успешно импортированы!'))
+        file_format = kwargs['format'] and f'.{kwargs["format"]}'
+        for name in ('ingredients', 'tags'):
+            path = kwargs[name]
+            if not path:
+                continue
+            try:
+                importer = import_file(
+                    name, path, kwargs['batch_size'],
+                    use_copy=kwargs['copy'], file_format=file_format
+                )
+            except (KeyError, OSError, ValueError) as error:
+                raise CommandError(f'{path}: {error}')
+            if name == 'ingredients':
+                ingredient_index.invalidate()
+            else:
+                tag_ids.invalidate()
+            bump_reference_version(name)
+            if importer.updated:
+                bump_reference_version('recipes')
+            self.stdout.write(self.style.SUCCESS(
+                f'{path}: добавлено {importer.inserted}, '
+                f'обновлено {importer.updated}, '
+                f'пропущено {importer.skipped}'
+            ))
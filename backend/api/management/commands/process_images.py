@@ -0,0 +1,52 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from api.constants import (
+    IMAGE_TASK_MAX_ATTEMPTS,
+    IMAGE_WORKER_BATCH,
+    IMAGE_WORKER_SLEEP,
+)
+from api.images import process_image_task
+from api.models import ImageTask
+
+
+class Command(BaseCommand):
+    help = 'Обрабатывает очередь изображений: превью, сжатие, очистка EXIF'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Обработать текущую очередь и завершиться'
+        )
+
+    def handle(self, *args, **kwargs):
+        while True:
+            processed = self.process_batch()
+            if not processed:
+                if kwargs['once']:
+                    return
+                sleep(IMAGE_WORKER_SLEEP)
+
+    def process_batch(self) -> int:
+        with transaction.atomic():
+            tasks = list(
+                ImageTask.objects.select_for_update(skip_locked=True).filter(
+                    attempts__lt=IMAGE_TASK_MAX_ATTEMPTS
+                ).order_by('pk')[:IMAGE_WORKER_BATCH]
+            )
+            for task in tasks:
+                try:
+                    with transaction.atomic():
+                        process_image_task(task)
+                except Exception as error:
+                    ImageTask.objects.filter(pk=task.pk).update(
+                        attempts=F('attempts') + 1, error=str(error)
+                    )
+                    self.stderr.write(f'{task}: {error}')
+                else:
+                    task.delete()
+        return len(tasks)
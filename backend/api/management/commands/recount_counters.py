@@ -0,0 +1,36 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.core.management.base import BaseCommand
+
+from api.models import Favorite, Recipe, Subscription
+from users.models import User
+
+
+def count_of(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счетчики избранного, рецептов и подписчиков'
+
+    def handle(self, *args, **kwargs):
+        counters = (
+            (Recipe, 'favorites_count', count_of(Favorite, 'recipe')),
+            (User, 'recipes_count', count_of(Recipe, 'author')),
+            (User, 'subscribers_count', count_of(Subscription, 'author')),
+        )
+        for model, field, actual in counters:
+            drifted = model.objects.annotate(actual=actual).exclude(
+                **{field: F('actual')}
+            ).values('pk')
+            fixed = model.objects.filter(pk__in=drifted).update(
+                **{field: actual}
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name_plural}.{field}: '
+                f'исправлено {fixed}'
+            ))
@@ -0,0 +1,204 @@
+import random
+from datetime import timedelta
+from io import BytesIO
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import DurationField, ExpressionWrapper, F, Value
+from PIL import Image
+
+from api.constants import (
+    SEED_AMOUNT_RANGE,
+    SEED_BATCH_SIZE,
+    SEED_COOKING_TIME_RANGE,
+    SEED_INGREDIENTS_RANGE,
+    SEED_PARETO_ALPHA,
+    SEED_PASSWORD,
+    SEED_PREFIX,
+    SEED_PUB_DATE_STEP,
+    SEED_TAGS_RANGE,
+    SEED_ZIPF_EXPONENT,
+)
+from api.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShopingList,
+    Subscription,
+    Tag,
+)
+from api.services import bump_reference_version
+from users.models import User
+
+
+def zipf_weights(size, exponent=SEED_ZIPF_EXPONENT):
+    return [1 / rank ** exponent for rank in range(1, size + 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, рецептами, '
+        'избранным, корзинами и подписками'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--batch-size', type=int, default=SEED_BATCH_SIZE
+        )
+
+    def popular(self, items):
+        """Случайная перестановка с весами Ципфа по рангу."""
+        items = list(items)
+        self.random.shuffle(items)
+        return items, zipf_weights(len(items))
+
+    def sample(self, items, weights, count):
+        chosen = set()
+        count = min(count, len(items))
+        while len(chosen) < count:
+            chosen.update(
+                self.random.choices(items, weights, k=count - len(chosen))
+            )
+        return chosen
+
+    def pareto_count(self, limit):
+        return min(int(self.random.paretovariate(SEED_PARETO_ALPHA)), limit)
+
+    def bulk_create(self, model, objects, **kwargs):
+        created = model.objects.bulk_create(
+            objects, batch_size=self.batch_size, **kwargs
+        )
+        self.stdout.write(
+            f'{model._meta.verbose_name_plural}: {len(created)}'
+        )
+        return created
+
+    def make_image(self):
+        buffer = BytesIO()
+        Image.new('RGB', (64, 64), (200, 120, 60)).save(buffer, 'PNG')
+        field = Recipe._meta.get_field('image')
+        return field.storage.save(
+            field.generate_filename(None, f'{SEED_PREFIX}.png'),
+            ContentFile(buffer.getvalue())
+        )
+
+    def create_users(self, count, start):
+        password = make_password(SEED_PASSWORD)
+        return self.bulk_create(User, [
+            User(
+                username=f'{SEED_PREFIX}_{number}',
+                email=f'{SEED_PREFIX}_{number}@example.com',
+                first_name=f'Имя {number}',
+                last_name=f'Фамилия {number}',
+                password=password
+            )
+            for number in range(start, start + count)
+        ])
+
+    def create_recipes(self, users, count, start):
+        authors, weights = self.popular(users)
+        image = self.make_image()
+        recipes = self.bulk_create(Recipe, [
+            Recipe(
+                author=author,
+                name=f'Рецепт {number}',
+                text=f'Описание рецепта {number}',
+                image=image,
+                cooking_time=self.random.randint(*SEED_COOKING_TIME_RANGE)
+            )
+            for number, author in enumerate(
+                self.random.choices(authors, weights, k=count), start
+            )
+        ])
+        last_pk = recipes[-1].pk
+        Recipe.objects.filter(pk__in=[recipe.pk for recipe in recipes]).update(
+            pub_date=F('pub_date') - ExpressionWrapper(
+                Value(timedelta(minutes=SEED_PUB_DATE_STEP))
+                * (Value(last_pk) - F('pk')),
+                output_field=DurationField()
+            )
+        )
+        return recipes
+
+    def fill_recipes(self, recipes):
+        ingredients, ingredient_weights = self.popular(
+            Ingredient.objects.values_list('pk', flat=True)
+        )
+        tags, tag_weights = self.popular(
+            Tag.objects.values_list('pk', flat=True)
+        )
+        self.bulk_create(RecipeIngredient, [
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient_id=ingredient,
+                amount=self.random.randint(*SEED_AMOUNT_RANGE)
+            )
+            for recipe in recipes
+            for ingredient in self.sample(
+                ingredients,
+                ingredient_weights,
+                self.random.randint(*SEED_INGREDIENTS_RANGE)
+            )
+        ])
+        self.bulk_create(Recipe.tags.through, [
+            Recipe.tags.through(recipe=recipe, tag_id=tag)
+            for recipe in recipes
+            for tag in self.sample(
+                tags, tag_weights, self.random.randint(*SEED_TAGS_RANGE)
+            )
+        ])
+
+    def create_relations(self, users, recipes):
+        popular_recipes, recipe_weights = self.popular(recipes)
+        popular_authors, author_weights = self.popular(users)
+        for model, field, items, weights in (
+            (Favorite, 'recipe', popular_recipes, recipe_weights),
+            (ShopingList, 'recipe', popular_recipes, recipe_weights),
+            (Subscription, 'author', popular_authors, author_weights),
+        ):
+            self.bulk_create(model, [
+                model(user=user, **{field: item})
+                for user in users
+                for item in self.sample(
+                    items, weights, self.pareto_count(len(items))
+                )
+                if item != user
+            ], ignore_conflicts=True)
+
+    def handle(self, *args, **options):
+        if not Ingredient.objects.exists() or not Tag.objects.exists():
+            raise CommandError(
+                'Сначала загрузите ингредиенты и теги: import_data'
+            )
+        if options['users'] < 1 or options['recipes'] < 1:
+            raise CommandError('Нужен хотя бы один пользователь и рецепт')
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        start = User.objects.filter(
+            username__startswith=f'{SEED_PREFIX}_'
+        ).count()
+        with transaction.atomic():
+            users = self.create_users(options['users'], start)
+            recipes = self.create_recipes(
+                users, options['recipes'],
+                Recipe.objects.filter(
+                    author__username__startswith=f'{SEED_PREFIX}_'
+                ).count()
+            )
+            self.fill_recipes(recipes)
+            self.create_relations(users, recipes)
+            Recipe.objects.filter(
+                pk__in=[recipe.pk for recipe in recipes]
+            ).update_search_vector()
+            bump_reference_version('recipes')
+        call_command('recount_counters', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пароль пользователей: {SEED_PASSWORD}'
+        ))
@@ -0,0 +1,182 @@
+import json
+import logging
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+
+from django.db import connections
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+from api.constants import (
+    INSTRUMENTATION_PERCENTILES,
+    INSTRUMENTATION_REPEAT_THRESHOLD,
+    INSTRUMENTATION_WINDOW,
+)
+from api.routers import pin_to_primary
+
+logger = logging.getLogger(__name__)
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+        self.view_started = None
+        self.view_time = 0.0
+        self.templates = Counter()
+
+    def record_query(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - started
+            self.queries += 1
+            self.templates[sql] += 1
+
+    def repeated(self, threshold):
+        return {
+            sql: count for sql, count in self.templates.items()
+            if count > threshold
+        }
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db_time * 1000, 3),
+            'serializer_ms': round(self.serializer_time * 1000, 3),
+            'view_ms': round(self.view_time * 1000, 3),
+        }
+
+
+class RouteStats:
+    """Скользящее окно длительностей запросов по маршрутам процесса."""
+
+    def __init__(self, window):
+        self.window = window
+        self._data = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = Lock()
+
+    def add(self, route, duration, queries):
+        with self._lock:
+            self._data[route].append((duration, queries))
+
+    def percentiles(self):
+        with self._lock:
+            data = {route: list(items) for route, items in self._data.items()}
+        stats = {}
+        for route, items in data.items():
+            durations = sorted(duration for duration, _ in items)
+            stats[route] = {
+                'count': len(items),
+                'max_queries': max(queries for _, queries in items),
+                **{
+                    f'p{percentile}_ms': round(durations[
+                        min(len(durations) - 1,
+                            len(durations) * percentile // 100)
+                    ] * 1000, 3)
+                    for percentile in INSTRUMENTATION_PERCENTILES
+                }
+            }
+        return stats
+
+
+route_stats = RouteStats(INSTRUMENTATION_WINDOW)
+
+
+def timed_serialization(data):
+    @wraps(data.fget)
+    def wrapper(serializer):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return data.fget(serializer)
+        metrics.serializer_depth += 1
+        started = perf_counter()
+        try:
+            return data.fget(serializer)
+        finally:
+            metrics.serializer_depth -= 1
+            if not metrics.serializer_depth:
+                metrics.serializer_time += perf_counter() - started
+    return property(wrapper)
+
+
+def instrument_serializers():
+    for serializer_class in (
+        serializers.Serializer, serializers.ListSerializer
+    ):
+        serializer_class.data = timed_serialization(serializer_class.data)
+
+
+class InstrumentationMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.record_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        finished = perf_counter()
+        total = finished - started
+        if metrics.view_started is not None:
+            metrics.view_time = finished - metrics.view_started
+        match = request.resolver_match
+        route = match.route if match else request.path
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={metrics.db_time * 1000:.3f};'
+            f'desc="{metrics.queries} queries"',
+            f'serializer;dur={metrics.serializer_time * 1000:.3f}',
+            f'view;dur={metrics.view_time * 1000:.3f}',
+            f'total;dur={total * 1000:.3f}',
+        ))
+        route_stats.add(route, total, metrics.queries)
+        logger.info(json.dumps({
+            'method': request.method,
+            'route': route,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 3),
+            **metrics.as_dict(),
+        }))
+        for sql, count in metrics.repeated(
+            INSTRUMENTATION_REPEAT_THRESHOLD
+        ).items():
+            logger.warning(json.dumps({
+                'n_plus_one': route,
+                'count': count,
+                'sql': sql,
+            }))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        current_metrics.get().view_started = perf_counter()
+
+
+class ReplicaPinMiddleware:
+    """После успешной записи читаем с основной базы, пока реплика догоняет."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request, response)
+        return response
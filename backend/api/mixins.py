@@ -1,10 +1,54 @@
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins, permissions, viewsets
+from rest_framework.renderers import JSONRenderer
 
 from api.models import RecipeIngredient
+from api.routers import (
+    is_pinned,
+    replica_enabled,
+    replica_reads,
+    use_replica,
+)
+from api.services import get_reference_content, get_reference_version
+
+
+def get_reference_etag(name: str, version: str) -> str:
+    return f'"{name}-{version}"'
+
+
+def finalize_reference_response(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+class ReplicaReadMixin:
+    replica_actions = ('list', 'retrieve')
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads(enabled=False):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            replica_enabled()
+            and self.action in self.replica_actions
+            and request.method in permissions.SAFE_METHODS
+            and not is_pinned(request, self.get_replica_pin_user(request))
+        ):
+            use_replica.set(True)
+
+    def get_replica_pin_user(self, request):
+        return request.user
 
 
 class IngridientTagMixin(
+    ReplicaReadMixin,
     mixins.RetrieveModelMixin,
     mixins.ListModelMixin,
     viewsets.GenericViewSet
@@ -12,24 +56,76 @@ class IngridientTagMixin(
     pagination_class = None
     filter_backends = (DjangoFilterBackend,)
     permission_classes = (permissions.AllowAny, )
+    reference_name = None
+
+    def perform_authentication(self, request):
+        pass
+
+    def get_replica_pin_user(self, request):
+        return None
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params:
+            return super().list(request, *args, **kwargs)
+        version, last_modified = get_reference_version(self.reference_name)
+        etag = get_reference_etag(self.reference_name, version)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = HttpResponse(
+                get_reference_content(
+                    self.reference_name, version, self.render_reference
+                ),
+                content_type='application/json'
+            )
+        return finalize_reference_response(response, etag, last_modified)
+
+    def render_reference(self) -> bytes:
+        with replica_reads(enabled=False):
+            serializer = self.get_serializer(self.get_queryset(), many=True)
+            return JSONRenderer().render(serializer.data)
 
 
 class AmountMixin():
     def update_or_create_ingredient(self, recipe, ingredients) -> None:
-        recipe.ingredients.clear()
-        ingredient_list = [
+        amounts = {
+            ingredient['id'].pk: ingredient['amount']
+            for ingredient in ingredients
+        }
+        existing = {
+            recipe_ingredient.ingredient_id: recipe_ingredient
+            for recipe_ingredient in RecipeIngredient.objects.filter(
+                recipe=recipe
+            )
+        }
+        removed = existing.keys() - amounts.keys()
+        if removed:
+            RecipeIngredient.objects.filter(
+                recipe=recipe, ingredient_id__in=removed
+            ).delete()
+        changed = []
+        for ingredient_id, recipe_ingredient in existing.items():
+            amount = amounts.get(ingredient_id)
+            if amount is not None and recipe_ingredient.amount != amount:
+                recipe_ingredient.amount = amount
+                changed.append(recipe_ingredient)
+        if changed:
+            RecipeIngredient.objects.bulk_update(changed, ('amount',))
+        RecipeIngredient.objects.bulk_create(
             RecipeIngredient(
                 recipe=recipe,
-                ingredient=ingredient['id'],
-                amount=ingredient['amount']
+                ingredient_id=ingredient_id,
+                amount=amounts[ingredient_id]
             )
-            for ingredient in ingredients
-        ]
-        RecipeIngredient.objects.bulk_create(ingredient_list)
+            for ingredient_id in amounts.keys() - existing.keys()
+        )
 
 
 class ChosenMixin():
-    def get_chosen_recipe(self, obj, model) -> bool:
+    def get_chosen_recipe(self, obj, model, annotation) -> bool:
+        if hasattr(obj, annotation):
+            return getattr(obj, annotation)
         user = self.context['request'].user
         return (
             False if user.is_anonymous
@@ -1,12 +1,35 @@
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+)
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
+from django.db.models import (
+    BooleanField,
+    Exists,
+    F,
+    OuterRef,
+    Prefetch,
+    Q,
+    Subquery,
+    Value,
+)
 
 from api.constants import (
     MAX_COOKING_TIME,
+    FIELD_NAME_LENGTH,
+    IMAGE_TASK_MAX_ATTEMPTS,
     MAX_INGREDIENT_AMOUNT,
     MEASUREMENT_UNIT_LENTH,
     MIN_INGREDIENT_AMOUNT,
     MIN_COOKING_TIME,
+    MODEL_LABEL_LENGTH,
+    SEARCH_CONFIG,
+    SHORT_LINK_LENGTH,
     TEXT_FIELD_LENGTH
 )
 from users.models import User
@@ -57,11 +80,85 @@ class Ingredient(models.Model):
                 fields=['name', 'measurement_unit'],
                 name='Uniqaue ingredient')
         ]
+        indexes = [
+            GinIndex(
+                fields=('name',),
+                opclasses=('gin_trgm_ops',),
+                name='ingredient_name_trgm_idx'
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+
+    def with_user_flags(self, user):
+        if user.is_anonymous:
+            return self.annotate(
+                is_favorited=Value(False, output_field=BooleanField()),
+                is_in_shopping_cart=Value(False, output_field=BooleanField())
+            )
+        return self.annotate(
+            is_favorited=Exists(
+                Favorite.objects.filter(user=user, recipe=OuterRef('pk'))
+            ),
+            is_in_shopping_cart=Exists(
+                ShopingList.objects.filter(user=user, recipe=OuterRef('pk'))
+            )
+        )
+
+    def for_read(self, user):
+        if user.is_anonymous:
+            authors = User.objects.annotate(
+                is_subscribed=Value(False, output_field=BooleanField())
+            )
+        else:
+            authors = User.objects.annotate(
+                is_subscribed=Exists(
+                    Subscription.objects.filter(
+                        user=user, author=OuterRef('pk')
+                    )
+                )
+            )
+        return self.with_user_flags(user).prefetch_related(
+            Prefetch('author', queryset=authors),
+            Prefetch('tags', queryset=Tag.objects.all()),
+            Prefetch(
+                'recipe_ingredients',
+                queryset=RecipeIngredient.objects.select_related('ingredient')
+            ),
+        )
+
+    def matching(self, query):
+        return self.filter(search_vector=SearchQuery(
+            query, config=SEARCH_CONFIG, search_type='websearch'
+        ))
+
+    def search(self, query):
+        search_query = SearchQuery(
+            query, config=SEARCH_CONFIG, search_type='websearch'
+        )
+        return self.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-rank', *self.model._meta.ordering)
+
+    def update_search_vector(self):
+        ingredient_names = RecipeIngredient.objects.filter(
+            recipe=OuterRef('pk')
+        ).values('recipe').annotate(
+            names=StringAgg('ingredient__name', delimiter=' ')
+        ).values('names')
+        return self.update(search_vector=(
+            SearchVector('name', weight='A', config=SEARCH_CONFIG)
+            + SearchVector(
+                Subquery(ingredient_names), weight='B', config=SEARCH_CONFIG
+            )
+            + SearchVector('text', weight='C', config=SEARCH_CONFIG)
+        ))
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(
         User,
@@ -77,6 +174,7 @@ class Recipe(models.Model):
     )
     text = models.TextField(blank=False, verbose_name='Рецепт')
     image = models.ImageField(blank=False, upload_to="recipe_images/")
+    image_renditions = models.JSONField(default=dict, editable=False)
     ingredients = models.ManyToManyField(
         Ingredient,
         blank=False,
@@ -102,12 +200,34 @@ class Recipe(models.Model):
         verbose_name='Дата публикации',
         auto_now_add=True
     )
+    search_vector = SearchVectorField(null=True, editable=False)
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В избранном'
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'рецепты'
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
         default_related_name = 'recipe'
+        indexes = [
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='recipe_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='recipe_author_pub_date_idx'
+            ),
+            GinIndex(
+                fields=('search_vector',),
+                name='recipe_search_vector_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['name', 'author'],
@@ -146,6 +266,7 @@ class RecipeIngredient(models.Model):
         constraints = [
             models.UniqueConstraint(
                 fields=['recipe', 'ingredient'],
+                include=['amount'],
                 name='unique_ingredients')
         ]
 
@@ -173,6 +294,12 @@ class Subscription(models.Model):
                 fields=['user', 'author'],
                 name='unique_subs')
         ]
+        indexes = [
+            models.Index(
+                fields=('user', 'id'),
+                name='subscription_user_id_idx'
+            ),
+        ]
 
     def __str__(self) -> str:
         return f'{self.user} {self.author}'
@@ -224,3 +351,65 @@ class ShopingList(models.Model):
 
     def __str__(self):
         return f'{self.recipe}'
+
+
+class ShortLink(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='short_link',
+        verbose_name='Рецепт'
+    )
+    code = models.CharField(
+        max_length=SHORT_LINK_LENGTH,
+        unique=True,
+        verbose_name='Код короткой ссылки'
+    )
+
+    class Meta:
+        verbose_name = 'Короткая ссылка'
+        verbose_name_plural = 'короткие ссылки'
+
+    def __str__(self):
+        return self.code
+
+
+class ImageTask(models.Model):
+    model_label = models.CharField(
+        max_length=MODEL_LABEL_LENGTH,
+        verbose_name='Модель'
+    )
+    object_id = models.PositiveBigIntegerField(verbose_name='Объект')
+    field_name = models.CharField(
+        max_length=FIELD_NAME_LENGTH,
+        verbose_name='Поле изображения'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попытки'
+    )
+    error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Поставлена в очередь'
+    )
+
+    class Meta:
+        verbose_name = 'Обработка изображения'
+        verbose_name_plural = 'очередь изображений'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['model_label', 'object_id', 'field_name'],
+                name='unique_image_task'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=('id',),
+                condition=Q(attempts__lt=IMAGE_TASK_MAX_ATTEMPTS),
+                name='image_task_pending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.model_label}:{self.object_id}.{self.field_name}'
@@ -0,0 +1,61 @@
+import csv
+import json
+
+from rest_framework import renderers
+
+from api.constants import SHOPPING_LIST_FIELDS, SHOPPING_LIST_TITLE
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+class ShoppingListTxtRenderer(renderers.BaseRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = data.get('detail', data)
+        return str(data).encode(self.charset)
+
+    def stream(self, ingredients):
+        yield f'{SHOPPING_LIST_TITLE}\n\n'
+        for ingredient in ingredients:
+            yield (
+                f"{ingredient['name']} - {ingredient['total']} "
+                f"{ingredient['unit']}\n"
+            )
+
+
+class ShoppingListCsvRenderer(ShoppingListTxtRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, ingredients):
+        writer = csv.writer(Echo())
+        yield writer.writerow(SHOPPING_LIST_FIELDS)
+        for ingredient in ingredients:
+            yield writer.writerow(
+                [ingredient[field] for field in SHOPPING_LIST_FIELDS]
+            )
+
+
+class ShoppingListJsonRenderer(renderers.JSONRenderer):
+    charset = 'utf-8'
+
+    def stream(self, ingredients):
+        separator = '['
+        for ingredient in ingredients:
+            yield separator + json.dumps(ingredient, ensure_ascii=False)
+            separator = ','
+        yield '[]' if separator == '[' else ']'
+
+
+SHOPPING_LIST_RENDERERS = (
+    ShoppingListTxtRenderer,
+    ShoppingListCsvRenderer,
+    ShoppingListJsonRenderer,
+)
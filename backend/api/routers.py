@@ -0,0 +1,76 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from api.constants import (
+    REPLICA_DATABASE,
+    REPLICA_PIN_COOKIE,
+    REPLICA_PIN_KEY,
+)
+
+use_replica = ContextVar('use_replica', default=False)
+
+
+class ReplicaRouter:
+    """
+    Чтения внутри replica_reads уходят на реплику, всё остальное
+    и все записи — на основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        if use_replica.get():
+            return REPLICA_DATABASE
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_DATABASE
+
+
+def replica_enabled() -> bool:
+    return REPLICA_DATABASE in settings.DATABASES
+
+
+def is_pinned(request, user) -> bool:
+    if REPLICA_PIN_COOKIE in request.COOKIES:
+        return True
+    return user is not None and user.is_authenticated and cache.get(
+        REPLICA_PIN_KEY.format(user.pk)
+    ) is not None
+
+
+async def ais_pinned(request, user) -> bool:
+    if REPLICA_PIN_COOKIE in request.COOKIES:
+        return True
+    return user is not None and user.is_authenticated and await cache.aget(
+        REPLICA_PIN_KEY.format(user.pk)
+    ) is not None
+
+
+def pin_to_primary(request, response) -> None:
+    """Закрепляет клиента за основной базой после записи."""
+    seconds = settings.REPLICA_PIN_SECONDS
+    response.set_cookie(
+        REPLICA_PIN_COOKIE, int(time()) + seconds,
+        max_age=seconds, httponly=True, samesite='Lax'
+    )
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        cache.set(REPLICA_PIN_KEY.format(user.pk), True, seconds)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    token = use_replica.set(enabled and replica_enabled())
+    try:
+        yield
+    finally:
+        use_replica.reset(token)
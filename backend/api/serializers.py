@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from rest_framework.exceptions import ValidationError
 
 from api.models import (
@@ -10,7 +11,11 @@ from api.models import (
     Favorite,
     ShopingList
 )
-from users.serializers import UserProfileSerializer, Base64ImageField
+from users.serializers import (
+    Base64ImageField,
+    ImageRenditionsField,
+    UserProfileSerializer,
+)
 from api.mixins import AmountMixin, ChosenMixin
 from api.constants import (
     MIN_INGREDIENT_AMOUNT,
@@ -50,8 +55,34 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
         fields = ('id', 'amount', 'measurement_unit', 'name')
 
 
+def resolve_in_bulk(queryset, ids, field_name):
+    found = queryset.in_bulk(set(ids))
+    missing = [pk for pk in ids if pk not in found]
+    if missing:
+        raise ValidationError(
+            RECIPE_VALIDATION_MESSAGES['NOT_FOUND'][field_name].format(
+                ', '.join(map(str, missing))
+            )
+        )
+    return found
+
+
+class BulkPrimaryKeyRelatedField(serializers.ListField):
+    def __init__(self, queryset, **kwargs):
+        self.queryset = queryset
+        super().__init__(child=serializers.IntegerField(), **kwargs)
+
+    def to_internal_value(self, data):
+        ids = super().to_internal_value(data)
+        found = resolve_in_bulk(self.queryset, ids, self.field_name)
+        return [found[pk] for pk in ids]
+
+    def to_representation(self, value):
+        return [obj.pk for obj in value.all()]
+
+
 class AddIngredientSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(queryset=Ingredient.objects.all())
+    id = serializers.IntegerField()
     amount = serializers.IntegerField(
         min_value=MIN_INGREDIENT_AMOUNT,
         max_value=MAX_INGREDIENT_AMOUNT
@@ -68,7 +99,8 @@ class RecipeGetSerializer(serializers.ModelSerializer, ChosenMixin):
         many=True
     )
     tags = TagSerializer(many=True)
-    image = Base64ImageField()
+    image = Base64ImageField(rendition='medium')
+    images = ImageRenditionsField(source='image', read_only=True)
     author = UserProfileSerializer(read_only=True)
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
@@ -83,25 +115,25 @@ class RecipeGetSerializer(serializers.ModelSerializer, ChosenMixin):
         model = Recipe
         fields = (
             'id', 'tags', 'author', 'ingredients', 'is_favorited',
-            'is_in_shopping_cart', 'name', 'image', 'text', 'cooking_time'
+            'is_in_shopping_cart', 'name', 'image', 'images', 'text',
+            'cooking_time'
         )
         read_only_fields = ('author',)
 
     def get_is_favorited(self, obj):
-        return self.get_chosen_recipe(obj, Favorite)
+        return self.get_chosen_recipe(obj, Favorite, 'is_favorited')
 
     def get_is_in_shopping_cart(self, obj):
-        return self.get_chosen_recipe(obj, ShopingList)
+        return self.get_chosen_recipe(
+            obj, ShopingList, 'is_in_shopping_cart'
+        )
 
 
 class RecipeSerializer(serializers.ModelSerializer, AmountMixin, ChosenMixin):
     ingredients = AddIngredientSerializer(
         required=True,
         many=True)
-    tags = serializers.PrimaryKeyRelatedField(
-        queryset=Tag.objects.all(),
-        many=True
-    )
+    tags = BulkPrimaryKeyRelatedField(queryset=Tag.objects.all())
     image = Base64ImageField()
     author = serializers.HiddenField(default=serializers.CurrentUserDefault())
     is_favorited = serializers.SerializerMethodField()
@@ -114,6 +146,16 @@ class RecipeSerializer(serializers.ModelSerializer, AmountMixin, ChosenMixin):
             'author', 'is_favorited', 'is_in_shopping_cart'
         )
 
+    def validate_ingredients(self, value):
+        found = resolve_in_bulk(
+            Ingredient.objects.all(),
+            [ingredient['id'] for ingredient in value],
+            'ingredients'
+        )
+        for ingredient in value:
+            ingredient['id'] = found[ingredient['id']]
+        return value
+
     def validate(self, data):
         unique_data: dict[str, set[int]] = {
             'ingredients': set(),
@@ -134,6 +176,7 @@ class RecipeSerializer(serializers.ModelSerializer, AmountMixin, ChosenMixin):
                 unique_data[model].add(obj)
         return data
 
+    @transaction.atomic
     def create(self, validated_data):
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
@@ -142,27 +185,33 @@ class RecipeSerializer(serializers.ModelSerializer, AmountMixin, ChosenMixin):
             recipe=recipe, ingredients=ingredients
         )
         recipe.tags.set(tags)
+        Recipe.objects.filter(pk=recipe.pk).update_search_vector()
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
+        Recipe.objects.select_for_update().only('pk').get(pk=instance.pk)
         self.update_or_create_ingredient(
             recipe=instance, ingredients=ingredients
         )
-        instance.tags.clear()
         instance.tags.set(tags)
         super().update(instance, validated_data)
+        Recipe.objects.filter(pk=instance.pk).update_search_vector()
         return instance
 
     def to_representation(self, instance):
+        request = self.context.get('request')
         return RecipeGetSerializer(
-            instance,
-            context={'request': self.context.get('request')}
+            Recipe.objects.for_read(request.user).get(pk=instance.pk),
+            context={'request': request}
         ).data
 
     def get_is_favorited(self, obj):
-        return self.get_chosen_recipe(obj, Favorite)
+        return self.get_chosen_recipe(obj, Favorite, 'is_favorited')
 
     def get_is_in_shopping_cart(self, obj):
-        return self.get_chosen_recipe(obj, ShopingList)
+        return self.get_chosen_recipe(
+            obj, ShopingList, 'is_in_shopping_cart'
+        )
@@ -1,52 +1,346 @@
-from collections import defaultdict
+import hashlib
+from time import time
+from uuid import uuid4
 
-from django.http import HttpResponse
-from urlshortner.utils import shorten_url
-from urlshortner.models import Url
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Greatest
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 
-from api.models import RecipeIngredient
+from api.caches import LRUCache
+from api.routers import replica_reads
+from api.constants import (
+    FEED_CACHE_KEY,
+    FEED_CACHE_TIMEOUT,
+    REFERENCE_CONTENT_KEY,
+    REFERENCE_CONTENT_TIMEOUT,
+    REFERENCE_VERSION_KEY,
+    SHOPPING_LIST_CHUNK_SIZE,
+    SHORT_LINK_ALPHABET,
+    SHORT_LINK_CACHE_KEY,
+    SHORT_LINK_CACHE_SIZE,
+    USER_FILTERS,
+    USER_FLAGS_KEY,
+    USER_FLAGS_TIMEOUT,
+)
+from api.models import (
+    Favorite,
+    Recipe,
+    RecipeIngredient,
+    ShopingList,
+    ShortLink,
+    Subscription,
+)
+
+
+short_link_cache = LRUCache(maxsize=SHORT_LINK_CACHE_SIZE)
+
+
+def encode_short_link(pk: int) -> str:
+    base = len(SHORT_LINK_ALPHABET)
+    code = ''
+    while True:
+        pk, remainder = divmod(pk, base)
+        code = SHORT_LINK_ALPHABET[remainder] + code
+        if not pk:
+            return code
+
+
+def decode_short_link(code: str) -> int | None:
+    base = len(SHORT_LINK_ALPHABET)
+    pk = 0
+    for char in code:
+        index = SHORT_LINK_ALPHABET.find(char)
+        if index < 0:
+            return None
+        pk = pk * base + index
+    return pk if code and encode_short_link(pk) == code else None
+
+
+def get_shared_short_link_cache():
+    alias = settings.SHORT_LINK_CACHE
+    return caches[alias] if alias else None
 
 
 def generate_short_link(request, pk):
-    base_domain = request.build_absolute_uri(
-    ).replace(request.get_full_path(), '')
+    return request.build_absolute_uri(
+        reverse('short_link', args=(encode_short_link(int(pk)),))
+    )
 
-    recipe_url = f'{base_domain}/recipes/{pk}/'
 
-    existing_short_url = Url.objects.filter(url=recipe_url).first()
-    if existing_short_url:
-        short_link = base_domain.replace(
-            request.get_full_path(), ''
-        ) + '/s/' + existing_short_url.short_url
-        return short_link
+def resolve_short_link(code: str) -> int | None:
+    recipe_id = short_link_cache.get(code)
+    if recipe_id is not None:
+        return recipe_id
+    shared_cache = get_shared_short_link_cache()
+    if shared_cache is not None:
+        recipe_id = shared_cache.get(SHORT_LINK_CACHE_KEY.format(code))
+    if recipe_id is None:
+        recipe_id = ShortLink.objects.filter(
+            code=code
+        ).values_list('recipe_id', flat=True).first()
+        if recipe_id is None:
+            recipe_id = decode_short_link(code)
+            if (
+                recipe_id is None
+                or not Recipe.objects.filter(pk=recipe_id).exists()
+            ):
+                return None
+            ShortLink.objects.get_or_create(
+                recipe_id=recipe_id, defaults={'code': code}
+            )
+        if shared_cache is not None:
+            shared_cache.set(SHORT_LINK_CACHE_KEY.format(code), recipe_id)
+    short_link_cache.set(code, recipe_id)
+    return recipe_id
 
-    recipe_url = shorten_url(recipe_url, is_permanent=False)
-    short_link = base_domain.replace(
-        request.get_full_path(), ''
-    ) + '/s/' + recipe_url
-    return short_link
 
+async def aresolve_short_link(code: str) -> int | None:
+    recipe_id = short_link_cache.get(code)
+    if recipe_id is not None:
+        return recipe_id
+    shared_cache = get_shared_short_link_cache()
+    if shared_cache is not None:
+        recipe_id = await shared_cache.aget(SHORT_LINK_CACHE_KEY.format(code))
+    if recipe_id is None:
+        recipe_id = await ShortLink.objects.filter(
+            code=code
+        ).values_list('recipe_id', flat=True).afirst()
+        if recipe_id is None:
+            return None
+        if shared_cache is not None:
+            await shared_cache.aset(
+                SHORT_LINK_CACHE_KEY.format(code), recipe_id
+            )
+    short_link_cache.set(code, recipe_id)
+    return recipe_id
 
-def list_to_txt(user):
-    text_shop_list = 'Список покупок \n\n'
-    ingredient_data = defaultdict(lambda: {'amount': 0, 'unit': ''})
 
-    ingredients = RecipeIngredient.objects.filter(
-        recipe__shoping_list__user=user
-    ).values('ingredient__name', 'ingredient__measurement_unit', 'amount')
+def forget_short_link(pk: int) -> None:
+    code = encode_short_link(pk)
+    short_link_cache.delete(code)
+    shared_cache = get_shared_short_link_cache()
+    if shared_cache is not None:
+        shared_cache.delete(SHORT_LINK_CACHE_KEY.format(code))
+
+
+def change_counter(queryset, field: str, delta: int) -> None:
+    queryset.update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def get_reference_cache():
+    return caches[settings.REFERENCE_CACHE]
+
+
+def get_version_cache():
+    return caches[settings.VERSION_CACHE]
+
+
+def get_reference_version(name: str) -> tuple[str, int]:
+    cache = get_version_cache()
+    key = REFERENCE_VERSION_KEY.format(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, new_reference_version(), None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_reference_version(name: str) -> tuple[str, int]:
+    cache = get_version_cache()
+    key = REFERENCE_VERSION_KEY.format(name)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, new_reference_version(), None)
+        version = await cache.aget(key)
+    return version
+
+
+def new_reference_version() -> tuple[str, int]:
+    return uuid4().hex, int(time())
+
+
+def bump_reference_version(name: str) -> None:
+    transaction.on_commit(lambda: get_version_cache().set(
+        REFERENCE_VERSION_KEY.format(name), new_reference_version(), None
+    ))
+
+
+def get_reference_content(name: str, version: str, render) -> bytes:
+    cache = get_reference_cache()
+    content = cache.get(REFERENCE_CONTENT_KEY.format(name, version))
+    if content is None:
+        content = render()
+        cache.set(
+            REFERENCE_CONTENT_KEY.format(name, version),
+            content,
+            REFERENCE_CONTENT_TIMEOUT
+        )
+    return content
+
+
+def get_feed_cache():
+    return caches[settings.FEED_CACHE]
+
 
-    for ingredient in ingredients:
-        name = ingredient['ingredient__name']
-        ingredient_data[name]['amount'] += ingredient['amount']
-        ingredient_data[name]['unit'] = (
-            ingredient['ingredient__measurement_unit']
+def is_feed_cacheable(request) -> bool:
+    return not (
+        request.user.is_authenticated
+        and any(name in request.GET for name in USER_FILTERS)
+    )
+
+
+def get_feed_cache_key(request, version=None) -> str:
+    if version is None:
+        version, _ = get_reference_version('recipes')
+    params = sorted(
+        (name, sorted(values))
+        for name, values in request.GET.lists()
+    )
+    digest = hashlib.md5(
+        repr((request.get_host(), params)).encode()
+    ).hexdigest()
+    return FEED_CACHE_KEY.format(version, digest)
+
+
+def get_cached_feed(request, render) -> dict:
+    cache = get_feed_cache()
+    key = get_feed_cache_key(request)
+    data = cache.get(key)
+    if data is None:
+        data = render()
+        cache.set(key, data, FEED_CACHE_TIMEOUT)
+    return data
+
+
+async def aget_cached_feed(request) -> dict | None:
+    version, _ = await aget_reference_version('recipes')
+    return await get_feed_cache().aget(get_feed_cache_key(request, version))
+
+
+def get_user_flags_querysets(user):
+    return {
+        'is_favorited': Favorite.objects.filter(
+            user=user
+        ).values_list('recipe_id', flat=True),
+        'is_in_shopping_cart': ShopingList.objects.filter(
+            user=user
+        ).values_list('recipe_id', flat=True),
+        'is_subscribed': Subscription.objects.filter(
+            user=user
+        ).values_list('author_id', flat=True),
+    }
+
+
+def get_user_flags(user) -> dict[str, set[int]]:
+    cache = get_feed_cache()
+    flags = cache.get(USER_FLAGS_KEY.format(user.pk))
+    if flags is None:
+        with replica_reads(enabled=False):
+            flags = {
+                name: set(queryset)
+                for name, queryset in get_user_flags_querysets(user).items()
+            }
+        cache.set(USER_FLAGS_KEY.format(user.pk), flags, USER_FLAGS_TIMEOUT)
+    return flags
+
+
+async def aget_user_flags(user) -> dict[str, set[int]]:
+    cache = get_feed_cache()
+    flags = await cache.aget(USER_FLAGS_KEY.format(user.pk))
+    if flags is None:
+        flags = {
+            name: {pk async for pk in queryset}
+            for name, queryset in get_user_flags_querysets(user).items()
+        }
+        await cache.aset(
+            USER_FLAGS_KEY.format(user.pk), flags, USER_FLAGS_TIMEOUT
+        )
+    return flags
+
+
+def forget_user_flags(user_id: int) -> None:
+    transaction.on_commit(
+        lambda: get_feed_cache().delete(USER_FLAGS_KEY.format(user_id))
+    )
+
+
+def apply_user_flags(data: dict, user) -> dict:
+    return overlay_user_flags(data, get_user_flags(user))
+
+
+def overlay_user_flags(data: dict, flags: dict[str, set[int]]) -> dict:
+    for recipe in data['results']:
+        recipe['is_favorited'] = recipe['id'] in flags['is_favorited']
+        recipe['is_in_shopping_cart'] = (
+            recipe['id'] in flags['is_in_shopping_cart']
+        )
+        recipe['author']['is_subscribed'] = (
+            recipe['author']['id'] in flags['is_subscribed']
         )
+    return data
 
-    for ingredient, data in ingredient_data.items():
-        text_shop_list += f"{ingredient} - {data['amount']} {data['unit']}\n"
 
-    response = HttpResponse(text_shop_list, content_type='text/plain')
+def get_shopping_list(user):
+    return RecipeIngredient.objects.filter(
+        recipe__shoping_list__user=user
+    ).values(
+        name=F('ingredient__name'),
+        unit=F('ingredient__measurement_unit')
+    ).annotate(
+        total=Sum('amount')
+    ).order_by('name', 'unit')
+
+
+def shopping_list_response(user, renderer):
+    ingredients = get_shopping_list(user).iterator(
+        chunk_size=SHOPPING_LIST_CHUNK_SIZE
+    )
+    response = StreamingHttpResponse(
+        renderer.stream(ingredients),
+        content_type=f'{renderer.media_type}; charset={renderer.charset}'
+    )
     response['Content-Disposition'] = (
-        'attachment; filename="shopping_list.txt"'
+        f'attachment; filename="shopping_list.{renderer.format}"'
     )
     return response
+
+
+def get_database_stats() -> dict[str, dict]:
+    stats = {}
+    for connection in connections.all():
+        info = {
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+        }
+        pool = getattr(connection, 'pool', None)
+        if pool is not None:
+            pool_stats = pool.get_stats()
+            requests = pool_stats.get('requests_num', 0)
+            info['pool'] = {
+                'size': pool_stats.get('pool_size', 0),
+                'max_size': pool_stats.get('pool_max', 0),
+                'in_use': (
+                    pool_stats.get('pool_size', 0)
+                    - pool_stats.get('pool_available', 0)
+                ),
+                'idle': pool_stats.get('pool_available', 0),
+                'waiting': pool_stats.get('requests_waiting', 0),
+                'requests': requests,
+                'avg_wait_ms': round(
+                    pool_stats.get('requests_wait_ms', 0) / requests, 3
+                ) if requests else 0,
+                'timeouts': pool_stats.get('requests_errors', 0),
+            }
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT coalesce(state, %s), count(*) FROM pg_stat_activity '
+                'WHERE datname = current_database() GROUP BY 1',
+                ('unknown',)
+            )
+            info['server'] = dict(cursor.fetchall())
+        stats[connection.alias] = info
+    return stats
@@ -0,0 +1,136 @@
+from django.db import connections
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from api.autocomplete import ingredient_index
+from api.constants import FEED_AUTHOR_FIELDS
+from api.filters import tag_ids
+from api.images import enqueue_image
+from api.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    ShopingList,
+    Subscription,
+    Tag,
+)
+from api.services import (
+    bump_reference_version,
+    change_counter,
+    forget_short_link,
+    forget_user_flags,
+)
+from users.authentication import forget_token
+from users.models import User
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, created, **kwargs):
+    enqueue_image(instance, 'image')
+    bump_reference_version('recipes')
+    if created:
+        change_counter(
+            User.objects.filter(pk=instance.author_id), 'recipes_count', 1
+        )
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields, **kwargs):
+    enqueue_image(instance, 'avatar')
+    # Лента кэшируется вместе с данными авторов; вход пользователя
+    # обновляет только last_login и ленту не сбрасывает.
+    if not created and (
+        update_fields is None or FEED_AUTHOR_FIELDS & update_fields
+    ):
+        bump_reference_version('recipes')
+    for key in Token.objects.filter(user_id=instance.pk).values_list(
+        'key', flat=True
+    ):
+        forget_token(key)
+
+
+@receiver(post_delete, sender=Token)
+@receiver(post_save, sender=Token)
+def token_changed(sender, instance, **kwargs):
+    forget_token(instance.key)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    forget_short_link(instance.pk)
+    bump_reference_version('recipes')
+    change_counter(
+        User.objects.filter(pk=instance.author_id), 'recipes_count', -1
+    )
+
+
+@receiver(post_save, sender=Favorite)
+def favorite_saved(sender, instance, created, **kwargs):
+    forget_user_flags(instance.user_id)
+    if created:
+        change_counter(
+            Recipe.objects.filter(pk=instance.recipe_id), 'favorites_count', 1
+        )
+
+
+@receiver(post_delete, sender=Favorite)
+def favorite_deleted(sender, instance, **kwargs):
+    forget_user_flags(instance.user_id)
+    change_counter(
+        Recipe.objects.filter(pk=instance.recipe_id), 'favorites_count', -1
+    )
+
+
+@receiver(post_save, sender=Subscription)
+def subscription_saved(sender, instance, created, **kwargs):
+    forget_user_flags(instance.user_id)
+    if created:
+        change_counter(
+            User.objects.filter(pk=instance.author_id), 'subscribers_count', 1
+        )
+
+
+@receiver(post_delete, sender=Subscription)
+def subscription_deleted(sender, instance, **kwargs):
+    forget_user_flags(instance.user_id)
+    change_counter(
+        User.objects.filter(pk=instance.author_id), 'subscribers_count', -1
+    )
+
+
+@receiver(post_delete, sender=Ingredient)
+def ingredient_deleted(sender, instance, **kwargs):
+    ingredient_index.invalidate()
+    bump_reference_version('ingredients')
+    bump_reference_version('recipes')
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_saved(sender, instance, created, **kwargs):
+    ingredient_index.invalidate()
+    bump_reference_version('ingredients')
+    if not created:
+        Recipe.objects.filter(ingredients=instance).update_search_vector()
+        bump_reference_version('recipes')
+
+
+@receiver(post_delete, sender=ShopingList)
+@receiver(post_save, sender=ShopingList)
+def shopping_list_changed(sender, instance, **kwargs):
+    forget_user_flags(instance.user_id)
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Tag)
+def tag_changed(sender, instance, **kwargs):
+    tag_ids.invalidate()
+    bump_reference_version('tags')
+    bump_reference_version('recipes')
+
+
+def create_extensions(sender, using, **kwargs):
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
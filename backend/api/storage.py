@@ -0,0 +1,81 @@
+import hashlib
+import os
+from collections import Counter
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+
+from api.constants import RENDITIONS_SUFFIX
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит файлы под именем хеша содержимого.
+
+    Одинаковые файлы записываются один раз, а delete() ничего не удаляет:
+    файл может использоваться несколькими объектами. Неиспользуемые файлы
+    удаляет команда collect_media; повторная загрузка обновляет время
+    изменения файла, чтобы сборщик не удалил его в течение MEDIA_GC_GRACE.
+    """
+
+    def save(self, name, content, max_length=None):
+        name = self.get_content_name(name, content)
+        if self.exists(name):
+            try:
+                os.utime(self.path(name))
+                return name
+            except FileNotFoundError:
+                pass
+        return super().save(name, content, max_length)
+
+    def get_content_name(self, name, content):
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        directory, filename = os.path.split(name)
+        digest = digest.hexdigest()
+        return os.path.join(
+            directory,
+            digest[:2],
+            digest + os.path.splitext(filename)[1].lower()
+        )
+
+    def delete(self, name):
+        pass
+
+    def purge(self, name):
+        super().delete(name)
+
+
+def get_file_fields():
+    for model in apps.get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, models.FileField):
+                yield model, field
+
+
+def count_references() -> Counter:
+    references = Counter()
+    for model, field in get_file_fields():
+        references.update(
+            model.objects.exclude(**{field.name: ''}).exclude(
+                **{f'{field.name}__isnull': True}
+            ).values_list(field.name, flat=True).iterator()
+        )
+        renditions_field = field.name + RENDITIONS_SUFFIX
+        if any(
+            model_field.name == renditions_field
+            for model_field in model._meta.get_fields()
+        ):
+            for renditions in model.objects.values_list(
+                renditions_field, flat=True
+            ).iterator():
+                references.update(
+                    name for key, name in renditions.items()
+                    if key != 'source'
+                )
+    return references
@@ -0,0 +1,70 @@
+from django.core.cache import caches
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from api.autocomplete import ingredient_index
+from api.filters import tag_ids
+from api.models import Ingredient, Recipe, RecipeIngredient, Tag
+from users.authentication import token_cache
+from users.models import User
+
+LOCMEM = 'django.core.cache.backends.locmem.LocMemCache'
+
+TEST_CACHES = {
+    alias: {'BACKEND': LOCMEM, 'LOCATION': alias}
+    for alias in ('default', 'versions', 'throttle')
+}
+
+
+# Маршрутизация на реплику проверяется отдельно в test_routing.
+@override_settings(CACHES=TEST_CACHES, DATABASE_ROUTERS=[])
+class APITestBase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Автор', last_name='Рецептов', password='pw-123456!'
+        )
+        cls.user = User.objects.create_user(
+            email='user@example.com', username='user',
+            first_name='Читатель', last_name='Рецептов', password='pw-123456!'
+        )
+        cls.tags = Tag.objects.bulk_create(
+            Tag(name=f'Тэг {index}', slug=f'tag{index}')
+            for index in range(3)
+        )
+        cls.ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f'Ингредиент {index}', measurement_unit='г')
+            for index in range(5)
+        )
+        cls.recipes = [
+            cls.create_recipe(f'Рецепт {index}', index)
+            for index in range(8)
+        ]
+
+    @classmethod
+    def create_recipe(cls, name, index, author=None):
+        recipe = Recipe.objects.create(
+            author=author or cls.author, name=name, text='Текст',
+            cooking_time=10, image='recipes/images/test.png'
+        )
+        recipe.tags.set(cls.tags[index % 3:index % 3 + 2])
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=10)
+            for ingredient in cls.ingredients[index % 5:index % 5 + 3]
+        )
+        return recipe
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        tag_ids.invalidate()
+        ingredient_index.invalidate()
+        token_cache.clear()
+
+    def authenticate(self, user):
+        """Токен вместо force_authenticate: его видит и быстрый путь ASGI."""
+        token, _ = Token.objects.get_or_create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
@@ -0,0 +1,124 @@
+import functools
+import json
+from unittest import mock
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory, RequestFactory
+from django.urls import resolve
+from rest_framework.authtoken.models import Token
+
+from api.async_views import ASYNC_READS, read_async
+from api.tests.base import APITestBase
+from api.urls import router
+
+HEADERS = ('Content-Type', 'Allow', 'Vary')
+
+
+class AsyncReadParityTests(APITestBase):
+    """Быстрый путь ASGI отвечает так же, как синхронный view под WSGI."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        super().setUp()
+        self.patterns = {
+            url.name: url for url in router.urls if url.name in ASYNC_READS
+        }
+
+    def urls(self):
+        recipe, tag = self.recipes[0].pk, self.tags[0].pk
+        ingredient = self.ingredients[0].pk
+        return (
+            ('resipe-list', '/api/recipes/', {}),
+            ('resipe-detail', f'/api/recipes/{recipe}/', {'pk': str(recipe)}),
+            ('resipe-detail', '/api/recipes/0/', {'pk': '0'}),
+            ('tags-list', '/api/tags/', {}),
+            ('tags-detail', f'/api/tags/{tag}/', {'pk': str(tag)}),
+            ('ingredients-list', '/api/ingredients/', {}),
+            (
+                'ingredients-detail',
+                f'/api/ingredients/{ingredient}/',
+                {'pk': str(ingredient)}
+            ),
+        )
+
+    def variants(self):
+        authorization = {'Authorization': f'Token {self.token.key}'}
+        return (
+            ('anonymous', '', {}),
+            ('user', '', authorization),
+            ('format=json', '?format=json', authorization),
+            ('format=api', '?format=api', {}),
+            ('html', '', {'Accept': 'text/html'}),
+            ('xml', '', {'Accept': 'application/xml'}),
+            ('bad token', '', {'Authorization': 'Token invalid'}),
+        )
+
+    def call(self, name, path, kwargs, headers):
+        url = self.patterns[name]
+        sync_response = self.render(url.callback(
+            self.request(RequestFactory(), path, headers), **kwargs
+        ))
+        calls = []
+
+        @functools.wraps(url.callback)
+        def sync_view(*args, **kwargs):
+            calls.append(True)
+            return url.callback(*args, **kwargs)
+
+        fast_view = read_async(sync_view, ASYNC_READS[name])
+        async_response = self.render(async_to_sync(fast_view)(
+            self.request(AsyncRequestFactory(), path, headers), **kwargs
+        ))
+        return sync_response, async_response, bool(calls)
+
+    def request(self, factory, path, headers):
+        request = factory.get(path, headers=headers)
+        request.resolver_match = resolve(urlsplit(path).path)
+        return request
+
+    def render(self, response):
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    def test_responses_match(self):
+        fast_paths = set()
+        for name, path, kwargs in self.urls():
+            for variant, query, headers in self.variants():
+                with self.subTest(path=path, variant=variant):
+                    sync, fast, fallback = self.call(
+                        name, path + query, kwargs, headers
+                    )
+                    self.assertEqual(fast.status_code, sync.status_code)
+                    for header in HEADERS:
+                        self.assertEqual(fast.get(header), sync.get(header))
+                    if sync['Content-Type'] == 'application/json':
+                        self.assertEqual(
+                            json.loads(fast.content), json.loads(sync.content)
+                        )
+                    if not fallback:
+                        fast_paths.add((name, variant))
+        self.assertTrue({
+            ('resipe-list', 'anonymous'),
+            ('resipe-detail', 'user'),
+            ('resipe-detail', 'format=json'),
+            ('tags-list', 'anonymous'),
+            ('ingredients-detail', 'user'),
+        } <= fast_paths, fast_paths)
+
+    def test_permission_denial_falls_back(self):
+        pk = self.recipes[0].pk
+        with mock.patch(
+            'api.permissions.IsAuthorOrReadOnly.has_permission',
+            return_value=False
+        ):
+            _, fast, fallback = self.call(
+                'resipe-detail', f'/api/recipes/{pk}/', {'pk': str(pk)}, {}
+            )
+        self.assertTrue(fallback)
+        self.assertEqual(fast.status_code, 401)
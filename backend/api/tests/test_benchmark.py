@@ -0,0 +1,53 @@
+import json
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test.utils import (
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from api.management.commands import benchmark
+from api.models import ShopingList
+from api.tests.base import APITestBase
+
+
+class BenchmarkCommandTests(APITestBase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        ShopingList.objects.create(user=cls.author, recipe=cls.recipes[0])
+
+    def run_benchmark(self):
+        output = tempfile.NamedTemporaryFile(suffix='.json')
+        self.addCleanup(output.close)
+        # Команда сама включает тестовое окружение.
+        teardown_test_environment()
+        try:
+            call_command(
+                'benchmark', repeat=2, warmup=0, output=output.name,
+                stdout=mock.MagicMock()
+            )
+        finally:
+            setup_test_environment()
+        with open(output.name) as file:
+            return json.load(file)['results']
+
+    def test_results_are_recorded(self):
+        results = self.run_benchmark()
+        self.assertIn('anonymous:recipes', results)
+        for name, result in results.items():
+            with self.subTest(name):
+                self.assertEqual(result['failed'], 0)
+                self.assertGreater(result['p50_ms'], 0)
+
+    def test_non_2xx_responses_fail_the_run(self):
+        user, endpoints = benchmark.get_endpoints()
+        endpoints += (('anonymous', 'missing', '/api/recipes/0/'),)
+        with mock.patch.object(
+            benchmark, 'get_endpoints', return_value=(user, endpoints)
+        ), self.assertRaisesMessage(CommandError, 'anonymous:missing'):
+            self.run_benchmark()
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from api.checks import (
+    check_persistent_connections,
+    check_throttle_cache,
+    get_connection_messages,
+    get_throttle_messages,
+)
+from api.tests.base import LOCMEM
+
+POOL = {'OPTIONS': {'pool': {'min_size': 1, 'max_size': 4}}}
+
+
+class PersistentConnectionsCheckTests(SimpleTestCase):
+
+    def ids(self, async_views=False, **options):
+        return [
+            message.id for message in get_connection_messages(
+                {'default': {**settings.DATABASES['default'], **options}},
+                async_views
+            )
+        ]
+
+    def test_current_settings(self):
+        self.assertFalse([
+            message for message in check_persistent_connections(None)
+            if message.is_serious()
+        ])
+
+    def test_pool_requires_non_persistent_connections(self):
+        self.assertEqual(self.ids(CONN_MAX_AGE=60, **POOL), ['api.E001'])
+        self.assertEqual(self.ids(CONN_MAX_AGE=0, **POOL), [])
+
+    def test_asgi_requires_non_persistent_connections(self):
+        self.assertEqual(
+            self.ids(async_views=True, CONN_MAX_AGE=60),
+            ['api.E002', 'api.W001']
+        )
+        self.assertEqual(self.ids(async_views=True, CONN_MAX_AGE=0), [
+            'api.W001'
+        ])
+        self.assertEqual(
+            self.ids(async_views=True, CONN_MAX_AGE=0, **POOL), []
+        )
+
+    def test_wsgi_keeps_persistent_connections(self):
+        self.assertEqual(self.ids(CONN_MAX_AGE=60), [])
+
+
+class ThrottleCacheCheckTests(SimpleTestCase):
+
+    def ids(self, backend, rates=None, debug=False):
+        return [message.id for message in get_throttle_messages(
+            {'BACKEND': backend}, rates or {'anon': '120/min'}, debug
+        )]
+
+    def test_current_settings(self):
+        self.assertEqual(check_throttle_cache(None), [])
+
+    def test_shared_cache_by_default(self):
+        self.assertNotEqual(settings.CACHES['throttle']['BACKEND'], LOCMEM)
+
+    def test_process_cache_outside_debug(self):
+        self.assertEqual(self.ids(LOCMEM), ['api.E003'])
+
+    def test_process_cache_allowed(self):
+        self.assertEqual(self.ids(LOCMEM, debug=True), [])
+        self.assertEqual(self.ids(LOCMEM, rates={'anon': None}), [])
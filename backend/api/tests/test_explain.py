@@ -0,0 +1,43 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+
+from api.management.commands.explain_queries import SEQ_SCAN, Command
+from api.models import Favorite, ShopingList
+from api.tests.base import APITestBase
+
+
+@skipUnlessDBFeature('supports_covering_indexes')
+class ExplainQueriesTests(APITestBase):
+    """Горячие запросы API не должны сканировать таблицы целиком."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Favorite.objects.create(user=cls.user, recipe=cls.recipes[0])
+        ShopingList.objects.create(user=cls.user, recipe=cls.recipes[1])
+
+    def test_hot_queries_use_indexes(self):
+        command = Command()
+        command.warm_caches()
+        for label, run in command.get_scenarios(self.user):
+            with self.subTest(label):
+                with CaptureQueriesContext(connection) as context:
+                    run()
+                for query in context.captured_queries:
+                    if not query['sql'].startswith('SELECT'):
+                        continue
+                    self.assertEqual(
+                        SEQ_SCAN.findall(command.explain(query['sql'])),
+                        [],
+                        query['sql']
+                    )
+
+    def test_command_passes_on_cold_caches(self):
+        stdout = StringIO()
+        call_command('explain_queries', stdout=stdout)
+        self.assertIn('теги', stdout.getvalue())
+        self.assertNotIn('Seq Scan', stdout.getvalue())
@@ -0,0 +1,52 @@
+from django.urls import reverse
+from django.utils import timezone
+
+from api.tests.base import APITestBase
+from users.models import User
+
+
+class FeedAuthorCacheTests(APITestBase):
+    """Кэш ленты сбрасывается, когда меняются данные автора."""
+
+    def authors(self):
+        response = self.client.get(reverse('api:resipe-list'))
+        self.assertEqual(response.status_code, 200)
+        return {
+            recipe['author']['first_name']
+            for recipe in response.json()['results']
+        }
+
+    def save_author(self, **fields):
+        for name, value in fields.items():
+            setattr(self.author, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.save(update_fields=fields or None)
+
+    def test_profile_change(self):
+        self.assertEqual(self.authors(), {'Автор'})
+        self.save_author(first_name='Шеф')
+        self.assertEqual(self.authors(), {'Шеф'})
+
+    def test_full_save(self):
+        self.authors()
+        self.author.first_name = 'Шеф'
+        self.save_author()
+        self.assertEqual(self.authors(), {'Шеф'})
+
+    def test_avatar_delete(self):
+        self.save_author(avatar='users/avatar.png')
+        response = self.client.get(reverse('api:resipe-list'))
+        self.assertTrue(response.json()['results'][0]['author']['avatar'])
+        self.authenticate(self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(reverse('api:users-upload-avatar'))
+        self.assertEqual(response.status_code, 204)
+        self.client.credentials()
+        response = self.client.get(reverse('api:resipe-list'))
+        self.assertIsNone(response.json()['results'][0]['author']['avatar'])
+
+    def test_login_keeps_cache(self):
+        self.authors()
+        User.objects.filter(pk=self.author.pk).update(first_name='Шеф')
+        self.save_author(last_login=timezone.now())
+        self.assertEqual(self.authors(), {'Автор'})
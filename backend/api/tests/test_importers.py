@@ -0,0 +1,36 @@
+import csv
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from api.models import Ingredient
+from api.tests.base import TEST_CACHES
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CopyImportTests(TestCase):
+
+    def write(self, rows):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / 'ingredients.csv'
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            csv.writer(file).writerows(rows)
+        return str(path)
+
+    def test_repeated_copy_in_one_transaction(self):
+        for rows in (
+            [('соль', 'г'), ('сахар', 'г')],
+            [('соль', 'кг'), ('перец', 'г')],
+        ):
+            call_command(
+                'import_data', ingredients=self.write(rows), copy=True,
+                stdout=StringIO()
+            )
+        self.assertEqual(
+            dict(Ingredient.objects.values_list('name', 'measurement_unit')),
+            {'соль': 'кг', 'сахар': 'г', 'перец': 'г'}
+        )
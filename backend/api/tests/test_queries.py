@@ -0,0 +1,73 @@
+from django.urls import reverse
+
+from api.models import Favorite, Subscription
+from api.tests.base import APITestBase
+from users.models import User
+
+
+class RecipeQueryCountTests(APITestBase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Favorite.objects.create(user=cls.user, recipe=cls.recipes[0])
+
+    def assert_list_queries(self, number):
+        for limit in (2, 6):
+            self.setUp()
+            with self.subTest(limit=limit), self.assertNumQueries(number):
+                response = self.client.get(
+                    reverse('api:resipe-list'), {'limit': limit}
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()['results']), limit)
+
+    def test_anonymous_list(self):
+        self.assert_list_queries(5)
+
+    def test_authenticated_list(self):
+        self.authenticate(self.user)
+        self.assert_list_queries(9)
+
+    def test_detail(self):
+        self.authenticate(self.user)
+        with self.assertNumQueries(5):
+            response = self.client.get(
+                reverse('api:resipe-detail', args=(self.recipes[0].pk,))
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['is_favorited'])
+
+
+class SubscriptionQueryCountTests(APITestBase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for index in range(3):
+            author = User.objects.create_user(
+                email=f'author{index}@example.com',
+                username=f'author{index}', first_name='Автор',
+                last_name='Рецептов', password='pw-123456!'
+            )
+            for number in range(4):
+                cls.create_recipe(f'Рецепт {index}.{number}', number, author)
+            Subscription.objects.create(user=cls.user, author=author)
+
+    def test_subscriptions(self):
+        self.authenticate(self.user)
+        for recipes_limit in (2, 4):
+            self.setUp()
+            with self.subTest(recipes_limit=recipes_limit):
+                with self.assertNumQueries(4):
+                    response = self.client.get(
+                        reverse('api:users-get_subscriptions'),
+                        {'recipes_limit': recipes_limit}
+                    )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    [len(author['recipes']) for author in response.json()[
+                        'results'
+                    ]],
+                    [recipes_limit] * 3
+                )
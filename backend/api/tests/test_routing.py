@@ -0,0 +1,97 @@
+from contextlib import ExitStack
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.constants import REPLICA_DATABASE, REPLICA_PIN_COOKIE
+from api.models import Recipe
+from api.tests.base import TEST_CACHES
+from users.authentication import get_token_user, token_cache
+from users.models import User
+
+
+@skipUnless(
+    REPLICA_DATABASE in settings.DATABASES,
+    'Реплика не настроена: задайте DB_REPLICA_HOST'
+)
+@override_settings(CACHES=TEST_CACHES)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    В тестах реплика — зеркало основной базы через отдельное соединение,
+    поэтому по захваченным запросам видно, куда ушло чтение.
+    """
+
+    databases = '__all__'
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user(
+            email='user@example.com', username='user',
+            first_name='Читатель', last_name='Рецептов', password='pw-123456!'
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.user, name='Рецепт', text='Текст',
+            cooking_time=10, image='recipes/images/test.png'
+        )
+        # Токен ищется на основной базе до выбора реплики, поэтому он
+        # заранее кладётся в кэш и не попадает в замеры.
+        key = Token.objects.create(user=self.user).key
+        token_cache.clear()
+        get_token_user(key)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {key}')
+
+    def request(self, method, url):
+        with ExitStack() as stack:
+            captured = {
+                alias: stack.enter_context(
+                    CaptureQueriesContext(connections[alias])
+                )
+                for alias in ('default', REPLICA_DATABASE)
+            }
+            response = getattr(self.client, method)(url)
+        return response, {
+            alias: len(context) for alias, context in captured.items()
+        }
+
+    def detail(self):
+        return self.request(
+            'get', reverse('api:resipe-detail', args=(self.recipe.pk,))
+        )
+
+    def favorite(self):
+        return self.request(
+            'post', reverse('api:resipe-favorite', args=(self.recipe.pk,))
+        )
+
+    def test_safe_read_goes_to_replica(self):
+        response, queries = self.detail()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries['default'], 0)
+        self.assertGreater(queries[REPLICA_DATABASE], 0)
+
+    def test_write_goes_to_primary(self):
+        response, queries = self.favorite()
+        self.assertEqual(response.status_code, 201)
+        self.assertGreater(queries['default'], 0)
+        self.assertEqual(queries[REPLICA_DATABASE], 0)
+        self.assertIn(REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_read_after_write_goes_to_primary(self):
+        self.favorite()
+        for with_cookie in (True, False):
+            with self.subTest(with_cookie=with_cookie):
+                if not with_cookie:
+                    self.client.cookies.clear()
+                response, queries = self.detail()
+                self.assertTrue(response.json()['is_favorited'])
+                self.assertGreater(queries['default'], 0)
+                self.assertEqual(queries[REPLICA_DATABASE], 0)
@@ -0,0 +1,33 @@
+import os
+import tempfile
+from time import time
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from api.constants import MEDIA_GC_GRACE
+from api.storage import ContentAddressedStorage
+
+
+class ContentAddressedStorageTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = ContentAddressedStorage(location=directory.name)
+
+    def test_same_content_is_stored_once(self):
+        first = self.storage.save('images/a.PNG', ContentFile(b'image'))
+        second = self.storage.save('images/b.png', ContentFile(b'image'))
+        self.assertEqual(first, second)
+        self.assertTrue(first.endswith('.png'))
+
+    def test_dedup_hit_refreshes_modified_time(self):
+        name = self.storage.save('images/a.png', ContentFile(b'image'))
+        stale = time() - MEDIA_GC_GRACE * 2
+        os.utime(self.storage.path(name), (stale, stale))
+        self.storage.save('images/b.png', ContentFile(b'image'))
+        self.assertGreater(
+            os.path.getmtime(self.storage.path(name)),
+            time() - MEDIA_GC_GRACE
+        )
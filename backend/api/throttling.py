@@ -0,0 +1,140 @@
+from time import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+from api.constants import THROTTLE_KEY, THROTTLE_PAGE_STEP
+
+
+def get_throttle_cache():
+    return caches[settings.THROTTLE_CACHE]
+
+
+def get_request_cost(request, cost=1) -> int:
+    """Цена запроса с надбавкой за глубокие страницы выдачи."""
+    page = request.GET.get('page', '')
+    if page.isdigit():
+        cost += int(page) // THROTTLE_PAGE_STEP
+    return cost
+
+
+class TokenBucket:
+    """
+    Ведро на capacity токенов, которое наполняется целиком за period
+    секунд. Состояние хранится в кэше THROTTLE_CACHE; одновременные
+    запросы из разных процессов могут изредка пропустить лишний токен.
+    """
+
+    def __init__(self, capacity: int, period: int) -> None:
+        self.capacity = capacity
+        self.period = period
+        self.refill_rate = capacity / period
+
+    def take(self, state, cost):
+        """Новое состояние ведра и сколько секунд ждать (0 — пропустить)."""
+        now = time()
+        tokens, updated = state or (self.capacity, now)
+        tokens = min(
+            self.capacity, tokens + (now - updated) * self.refill_rate
+        )
+        cost = min(cost, self.capacity)
+        if tokens >= cost:
+            return (tokens - cost, now), 0
+        return (tokens, now), (cost - tokens) / self.refill_rate
+
+    def consume(self, key, cost) -> float:
+        cache = get_throttle_cache()
+        state, wait = self.take(cache.get(key), cost)
+        cache.set(key, state, self.period)
+        return wait
+
+    async def aconsume(self, key, cost) -> float:
+        cache = get_throttle_cache()
+        state, wait = self.take(await cache.aget(key), cost)
+        await cache.aset(key, state, self.period)
+        return wait
+
+
+class BucketThrottle(SimpleRateThrottle):
+    """
+    Троттлинг по ведру токенов. Действие стоит view.throttle_costs[action]
+    токенов (по умолчанию 1), глубокие страницы — дороже.
+    """
+
+    cache_format = THROTTLE_KEY
+
+    def __init__(self):
+        super().__init__()
+        self.delay = 0
+        if self.rate is not None:
+            self.bucket = TokenBucket(self.num_requests, self.duration)
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def get_cost(self, request, view) -> int:
+        costs = getattr(view, 'throttle_costs', {})
+        return get_request_cost(
+            request, costs.get(getattr(view, 'action', None), 1)
+        )
+
+    def allow_request(self, request, view):
+        if self.rate is None or getattr(
+            request._request, 'throttle_paid', False
+        ):
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.delay = self.bucket.consume(
+            self.key, self.get_cost(request, view)
+        )
+        return not self.delay
+
+    def wait(self):
+        return self.delay
+
+
+class AnonBucketThrottle(BucketThrottle):
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.cache_format.format(
+            scope=self.scope, ident=self.get_ident(request)
+        )
+
+
+class UserBucketThrottle(BucketThrottle):
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return None
+        return self.cache_format.format(
+            scope=self.scope, ident=request.user.pk
+        )
+
+
+async def athrottle(request, user) -> float:
+    """
+    Списывает цену чтения для асинхронных путей и помечает запрос,
+    чтобы синхронный view при откате не списал её повторно.
+    """
+    throttle_class = (
+        UserBucketThrottle if user.is_authenticated else AnonBucketThrottle
+    )
+    throttle = throttle_class()
+    request.throttle_paid = True
+    if throttle.rate is None:
+        return 0
+    ident = user.pk if user.is_authenticated else BaseThrottle().get_ident(
+        request
+    )
+    return await throttle.bucket.aconsume(
+        throttle.cache_format.format(scope=throttle.scope, ident=ident),
+        get_request_cost(request)
+    )
@@ -1,8 +1,17 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import SimpleRouter
 
+from api.async_views import with_async_reads
 from api.constants import API_VERSION
-from api.views import TagViewSet, IngredientViewSet, RecipeViewSet
+from api.views import (
+    IngredientViewSet,
+    RecipeViewSet,
+    TagViewSet,
+    auth_cache_stats,
+    database_stats,
+    instrumentation_stats,
+)
 from users.views import UsersViewSet
 
 
@@ -18,7 +27,21 @@ router.register(r'ingredients', IngredientViewSet, basename='ingredients')
 router.register(r'recipes', RecipeViewSet, basename='resipe')
 
 
+router_urls = router.urls
+if settings.ASYNC_VIEWS:
+    router_urls = with_async_reads(router_urls)
+
+
 urlpatterns = [
-    path(API_VERSION, include(router.urls)),
+    path(API_VERSION, include(router_urls)),
     path(API_VERSION + 'auth/', include('djoser.urls.authtoken')),
+    path(
+        API_VERSION + 'instrumentation/',
+        instrumentation_stats,
+        name='instrumentation'
+    ),
+    path(API_VERSION + 'database/', database_stats, name='database'),
+    path(
+        API_VERSION + 'auth-cache/', auth_cache_stats, name='auth-cache'
+    ),
 ]
@@ -1,20 +1,44 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
-from rest_framework.decorators import action
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.decorators import (
+    action,
+    api_view,
+    permission_classes,
+)
+from rest_framework.permissions import (
+    AllowAny,
+    IsAdminUser,
+    IsAuthenticated,
+)
 
 from django_filters.rest_framework import DjangoFilterBackend
-from django.shortcuts import get_object_or_404
+from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
+from django.shortcuts import get_object_or_404, redirect
 from django.http import Http404
+from urlshortner.views import redirect_to_url
 
+from api.autocomplete import ingredient_index
 from api.models import Tag, Ingredient, Recipe, ShopingList, Favorite
-from api.mixins import IngridientTagMixin
+from api.middleware import route_stats
+from api.mixins import IngridientTagMixin, ReplicaReadMixin
 from api.permissions import IsAuthorOrReadOnly
-from api.pagination import LimitPagination
+from api.pagination import RecipePagination
 from api.filters import IngredientFilter, TagFilter, RecipeFilter
 from api import serializers
-from api.constants import MESSAGES
-from api.services import list_to_txt, generate_short_link
+from api.constants import MESSAGES, RECIPE_THROTTLE_COSTS
+from api.renderers import SHOPPING_LIST_RENDERERS
+from api.routers import replica_reads
+from api.services import (
+    apply_user_flags,
+    generate_short_link,
+    get_database_stats,
+    get_cached_feed,
+    is_feed_cacheable,
+    resolve_short_link,
+    shopping_list_response,
+)
+from users.authentication import token_cache_stats
 from users.serializers import RecipeMiniSerializer
 
 
@@ -22,21 +46,62 @@ class TagViewSet(IngridientTagMixin):
     queryset = Tag.objects.all()
     serializer_class = serializers.TagSerializer
     filterset_class = TagFilter
+    reference_name = 'tags'
 
 
 class IngredientViewSet(IngridientTagMixin):
     queryset = Ingredient.objects.all()
     serializer_class = serializers.IngredientSerializer
     filterset_class = IngredientFilter
+    reference_name = 'ingredients'
 
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if not name:
+            return super().list(request, *args, **kwargs)
+        return Response(ingredient_index.search(name))
 
-class RecipeViewSet(viewsets.ModelViewSet):
+
+class RecipeViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
-    pagination_class = LimitPagination
+    pagination_class = RecipePagination
     permission_classes = (IsAuthorOrReadOnly,)
     http_method_names = ('get', 'post', 'patch', 'delete')
+    lookup_value_regex = r'\d+'
+    throttle_costs = RECIPE_THROTTLE_COSTS
+
+    def get_queryset(self):
+        if self.request.method in permissions.SAFE_METHODS:
+            return Recipe.objects.for_read(self.request.user)
+        return Recipe.objects.with_user_flags(self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        if not is_feed_cacheable(request):
+            return super().list(request, *args, **kwargs)
+        data = get_cached_feed(request, self.render_anonymous_feed)
+        if request.user.is_authenticated:
+            data = apply_user_flags(data, request.user)
+        return Response(data)
+
+    def render_anonymous_feed(self):
+        # Страница ленты кэшируется для всех под текущей версией рецептов.
+        # Отстающая реплика записала бы под новую версию старые данные,
+        # и закрепление за основной базой автора записи бы уже не помогло.
+        # Реплику разгружает сам кэш: рендер идёт раз на версию и запрос.
+        with replica_reads(enabled=False):
+            return self.paginate_anonymous_feed()
+
+    def paginate_anonymous_feed(self):
+        queryset = self.filter_queryset(
+            Recipe.objects.for_read(AnonymousUser())
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = serializers.RecipeGetSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(serializer.data).data
 
     def get_serializer_class(self):
         if self.request.method in permissions.SAFE_METHODS:
@@ -71,7 +136,8 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 MESSAGES['ALREADY_ADDED'][error_key],
                 status=status.HTTP_400_BAD_REQUEST
             )
-        model.objects.create(recipe=recipe, user=user)
+        with transaction.atomic():
+            model.objects.create(recipe=recipe, user=user)
         serializer = RecipeMiniSerializer(recipe)
         return Response(data=serializer.data, status=status.HTTP_201_CREATED)
 
@@ -92,6 +158,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
         ['GET'],
         detail=False,
         permission_classes=(IsAuthenticated, ),
+        renderer_classes=SHOPPING_LIST_RENDERERS,
     )
     def download_shopping_cart(self, request):
         if not request.user.shoping_list.exists():
@@ -99,7 +166,9 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 'Список покупок пуст.',
                 status=status.HTTP_404_NOT_FOUND
             )
-        return list_to_txt(user=request.user)
+        return shopping_list_response(
+            user=request.user, renderer=request.accepted_renderer
+        )
 
     @action(
         ['GET'],
@@ -111,3 +180,28 @@ class RecipeViewSet(viewsets.ModelViewSet):
     def get_link(self, request, pk):
         short_link = generate_short_link(request, pk)
         return Response({'short-link': short_link})
+
+
+def short_link_redirect(request, code):
+    recipe_id = resolve_short_link(code)
+    if recipe_id is None:
+        return redirect_to_url(request, code)
+    return redirect(f'/recipes/{recipe_id}/')
+
+
+@api_view(('GET',))
+@permission_classes((IsAdminUser,))
+def instrumentation_stats(request):
+    return Response(route_stats.percentiles())
+
+
+@api_view(('GET',))
+@permission_classes((IsAdminUser,))
+def database_stats(request):
+    return Response(get_database_stats())
+
+
+@api_view(('GET',))
+@permission_classes((IsAdminUser,))
+def auth_cache_stats(request):
+    return Response(token_cache_stats.as_dict())
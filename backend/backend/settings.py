@@ -17,6 +17,7 @@ DJANGO_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 
 ADDED_APPS = [
@@ -50,18 +51,31 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachingTokenAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # Число доверенных прокси перед приложением: адрес клиента берётся
+    # из X-Forwarded-For, который дописывает nginx.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 1)),
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.AnonBucketThrottle',
+        'api.throttling.UserBucketThrottle',
+    ],
+    # Ёмкость ведра на период; пустое значение отключает троттлинг.
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': os.getenv('THROTTLE_ANON_RATE', '120/min') or None,
+        'user': os.getenv('THROTTLE_USER_RATE', '300/min') or None,
+    },
 }
 
 DJOSER = {
     'LOGIN_FIELD': 'email',
     'HIDE_USERS': False,
+    'LOGOUT_ON_PASSWORD_CHANGE': True,
     'SERIALIZERS': {
         'user': 'users.serializers.UserProfileSerializer',
         'user_create': 'users.serializers.SignUpSerializer',
@@ -85,6 +99,27 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+INSTRUMENTATION = os.getenv('INSTRUMENTATION') == 'True'
+
+ASYNC_VIEWS = os.getenv('ASGI') == 'True'
+
+if INSTRUMENTATION:
+    MIDDLEWARE.insert(0, 'api.middleware.InstrumentationMiddleware')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api': {
+            'handlers': ['console'],
+            'level': os.getenv('API_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
 ROOT_URLCONF = 'backend.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -114,10 +149,41 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', 'foodgram_user'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'mysecretpassword'),
         'HOST': os.getenv('DB_HOST', ''),
-        'PORT': os.getenv('DB_PORT', 5432)
+        'PORT': os.getenv('DB_PORT', 5432),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
     }
 }
 
+if os.getenv('DB_POOL') == 'True':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 4)),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        },
+    }
+
+# Под ASGI каждый запрос выполняет синхронный код в своём потоке, и
+# постоянные соединения утекают вместе с потоками. Переиспользовать
+# соединения в этом режиме нужно через пул: DB_POOL=True.
+if ASYNC_VIEWS:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+
+REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', 5))
+
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+    MIDDLEWARE.append('api.middleware.ReplicaPinMiddleware')
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -151,8 +217,73 @@ STATIC_ROOT = BASE_DIR / 'collected_static'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'api.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+CACHE_BACKEND = os.getenv(
+    'CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'
+)
+
+# Версии справочников и ленты хранятся бессрочно в отдельном кэше, чтобы
+# вытеснение страниц ленты и флагов пользователей их не затрагивало.
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv('CACHE_LOCATION', '/tmp/foodgram_cache'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 10000)),
+        },
+    },
+    # Вёдра троттлинга общие для всех воркеров и переживают перезапуск:
+    # кэш в памяти процесса умножил бы лимиты на число воркеров.
+    'throttle': {
+        'BACKEND': os.getenv('THROTTLE_CACHE_BACKEND', CACHE_BACKEND),
+        'LOCATION': os.getenv(
+            'THROTTLE_CACHE_LOCATION', '/tmp/foodgram_throttle'
+        ),
+        'KEY_PREFIX': 'throttle',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(
+                os.getenv('THROTTLE_CACHE_MAX_ENTRIES', 10000)
+            ),
+        },
+    },
+    'versions': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv(
+            'VERSION_CACHE_LOCATION', '/tmp/foodgram_versions'
+        ),
+        'KEY_PREFIX': 'versions',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('VERSION_CACHE_MAX_ENTRIES', 1000)),
+        },
+    },
+}
+
+VERSION_CACHE = os.getenv('VERSION_CACHE', 'versions')
+
+SHORT_LINK_CACHE = os.getenv('SHORT_LINK_CACHE')
+
+REFERENCE_CACHE = os.getenv('REFERENCE_CACHE', 'default')
+
+FEED_CACHE = os.getenv('FEED_CACHE', 'default')
+
+# Общий кэш токенов между процессами; без него остаётся только LRU в памяти.
+# TTL короткий: после отзыва токена другие процессы держат его до истечения.
+AUTH_TOKEN_CACHE = os.getenv('AUTH_TOKEN_CACHE')
+
+THROTTLE_CACHE = os.getenv('THROTTLE_CACHE', 'throttle')
+
+AUTH_TOKEN_CACHE_TTL = int(os.getenv('AUTH_TOKEN_CACHE_TTL', 30))
+
 CSRF_TRUSTED_ORIGINS = [
     'https://foodgram-pet.ddns.net',
 ]
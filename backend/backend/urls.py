@@ -1,11 +1,20 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
+from api import async_views, views
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
+    path(
+        's/<str:code>',
+        async_views.short_link_redirect
+        if settings.ASYNC_VIEWS else views.short_link_redirect,
+        name='short_link'
+    ),
     path('s/', include('urlshortner.urls')),
     path(
         'redoc/',
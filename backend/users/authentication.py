@@ -0,0 +1,132 @@
+import copy
+import hashlib
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from api.caches import LRUCache
+from users.constants import AUTH_TOKEN_CACHE_KEY, AUTH_TOKEN_CACHE_SIZE
+
+
+class TokenCacheStats:
+
+    def __init__(self):
+        self.local_hits = self.shared_hits = self.misses = 0
+        self._lock = Lock()
+
+    def add(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def as_dict(self) -> dict:
+        total = self.local_hits + self.shared_hits + self.misses
+        return {
+            'local_hits': self.local_hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'hit_rate': round(
+                (self.local_hits + self.shared_hits) / total, 4
+            ) if total else 0,
+        }
+
+
+token_cache = LRUCache(
+    maxsize=AUTH_TOKEN_CACHE_SIZE, ttl=settings.AUTH_TOKEN_CACHE_TTL
+)
+token_cache_stats = TokenCacheStats()
+
+
+def get_shared_token_cache():
+    alias = settings.AUTH_TOKEN_CACHE
+    return caches[alias] if alias else None
+
+
+def get_shared_key(key: str) -> str:
+    return AUTH_TOKEN_CACHE_KEY.format(
+        hashlib.sha256(key.encode()).hexdigest()
+    )
+
+
+def remember_token(key: str, user) -> None:
+    token_cache.set(key, user)
+    shared_cache = get_shared_token_cache()
+    if shared_cache is not None:
+        shared_cache.set(
+            get_shared_key(key), user, settings.AUTH_TOKEN_CACHE_TTL
+        )
+
+
+def forget_token(key: str) -> None:
+    token_cache.delete(key)
+    shared_cache = get_shared_token_cache()
+    if shared_cache is not None:
+        shared_cache.delete(get_shared_key(key))
+
+
+def get_token_user(key: str):
+    user = token_cache.get(key)
+    if user is not None:
+        token_cache_stats.add('local_hits')
+        return copy.copy(user)
+    shared_cache = get_shared_token_cache()
+    if shared_cache is not None:
+        user = shared_cache.get(get_shared_key(key))
+        if user is not None:
+            token_cache_stats.add('shared_hits')
+            token_cache.set(key, user)
+            return copy.copy(user)
+    token_cache_stats.add('misses')
+    token = Token.objects.select_related('user').filter(key=key).first()
+    if token is None:
+        return None
+    remember_token(key, token.user)
+    return copy.copy(token.user)
+
+
+async def aget_token_user(key: str):
+    user = token_cache.get(key)
+    if user is not None:
+        token_cache_stats.add('local_hits')
+        return copy.copy(user)
+    shared_cache = get_shared_token_cache()
+    if shared_cache is not None:
+        user = await shared_cache.aget(get_shared_key(key))
+        if user is not None:
+            token_cache_stats.add('shared_hits')
+            token_cache.set(key, user)
+            return copy.copy(user)
+    token_cache_stats.add('misses')
+    token = await Token.objects.select_related('user').filter(
+        key=key
+    ).afirst()
+    if token is None:
+        return None
+    token_cache.set(key, token.user)
+    if shared_cache is not None:
+        await shared_cache.aset(
+            get_shared_key(key), token.user, settings.AUTH_TOKEN_CACHE_TTL
+        )
+    return copy.copy(token.user)
+
+
+class CachingTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication с кэшем token -> user.
+
+    Записи живут не дольше AUTH_TOKEN_CACHE_TTL секунд и сбрасываются
+    сигналами при удалении токена и изменении пользователя.
+    """
+
+    def authenticate_credentials(self, key):
+        user = get_token_user(key)
+        if user is None:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+        return user, Token(key=key, user=user)
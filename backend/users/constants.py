@@ -12,3 +12,6 @@ USER_ROLE_CHOICES = tuple(
         MODERATOR_ROLE_NAME
     )
 )
+
+AUTH_TOKEN_CACHE_SIZE: int = 10000
+AUTH_TOKEN_CACHE_KEY: str = 'auth-token:{}'
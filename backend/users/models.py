@@ -27,6 +27,17 @@ class User(AbstractUser):
         default=None,
         verbose_name='Avatar'
     )
+    avatar_renditions = models.JSONField(default=dict, editable=False)
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Recipes count'
+    )
+    subscribers_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Subscribers count'
+    )
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = (
@@ -1,13 +1,18 @@
-import base64
+import binascii
 import re
 
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from djoser.serializers import UserCreateSerializer as BaseUserCreateSerializer
 from django.contrib.auth import get_user_model
-from django.core.files.base import ContentFile
-
-from api.constants import USERNAME_LENGTH
+from django.db.models.fields.files import FieldFile
+
+from api.constants import (
+    IMAGE_RENDITIONS,
+    RENDITIONS_SUFFIX,
+    USERNAME_LENGTH,
+)
+from api.images import decode_base64_file
 from api.models import Subscription, Recipe
 from users.constants import EMAIL_FIELD_LENGTH
 
@@ -15,21 +20,63 @@ from users.constants import EMAIL_FIELD_LENGTH
 User = get_user_model()
 
 
-class RecipeMiniSerializer(serializers.ModelSerializer):
-
-    class Meta:
-        model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time',)
+def get_recipes_limit(request):
+    try:
+        recipes_limit = int(request.GET.get('recipes_limit'))
+    except (TypeError, ValueError):
+        return None
+    return recipes_limit if recipes_limit > 0 else None
 
 
 class Base64ImageField(serializers.ImageField):
+    def __init__(self, *args, rendition=None, **kwargs):
+        self.rendition = rendition
+        super().__init__(*args, **kwargs)
+
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
             format, imgstr = data.split(';base64,')
             ext = format.split('/')[-1]
-            data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
+            try:
+                data = decode_base64_file(imgstr, name='temp.' + ext)
+            except (binascii.Error, ValueError):
+                self.fail('invalid_image')
         return super().to_internal_value(data)
 
+    def to_representation(self, value):
+        if value and self.rendition:
+            value = get_rendition(value, self.rendition)
+        return super().to_representation(value)
+
+
+class ImageRenditionsField(serializers.ImageField):
+    def to_representation(self, value):
+        if not value:
+            return None
+        return {
+            rendition: super(ImageRenditionsField, self).to_representation(
+                get_rendition(value, rendition)
+            )
+            for rendition in IMAGE_RENDITIONS
+        }
+
+
+def get_rendition(value, rendition):
+    renditions = getattr(
+        value.instance, value.field.name + RENDITIONS_SUFFIX
+    )
+    if renditions.get('source') != value.name or rendition not in renditions:
+        return value
+    return FieldFile(value.instance, value.field, renditions[rendition])
+
+
+class RecipeMiniSerializer(serializers.ModelSerializer):
+    image = Base64ImageField(read_only=True, rendition='thumbnail')
+
+    class Meta:
+        model = Recipe
+        fields = ('id', 'name', 'image', 'cooking_time',)
+
 
 class AvatarSerializer(serializers.ModelSerializer):
     avatar = Base64ImageField(required=True, allow_null=False)
@@ -108,7 +155,9 @@ class SignUpSerializer(BaseUserCreateSerializer):
 
 class UserProfileSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
-    avatar = Base64ImageField(required=False, allow_null=True)
+    avatar = Base64ImageField(
+        required=False, allow_null=True, rendition='thumbnail'
+    )
 
     class Meta:
         model = User
@@ -116,6 +165,8 @@ class UserProfileSerializer(serializers.ModelSerializer):
                   'last_name', 'is_subscribed', 'avatar')
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         user = self.context['request'].user
         if not user or user.is_anonymous:
             return False
@@ -158,16 +209,13 @@ class SubscribeSerializer(serializers.ModelSerializer):
     first_name = serializers.ReadOnlyField(source='author.first_name')
     last_name = serializers.ReadOnlyField(source='author.last_name')
     is_subscribed = serializers.SerializerMethodField()
-    recipes = RecipeMiniSerializer(
-        read_only=True,
-        many=True,
-        source='author.recipe'
-    )
+    recipes = serializers.SerializerMethodField()
     recipes_count = serializers.SerializerMethodField()
     avatar = Base64ImageField(
         source='author.avatar',
         required=False,
-        allow_null=True
+        allow_null=True,
+        rendition='thumbnail'
     )
 
     class Meta:
@@ -183,18 +231,18 @@ class SubscribeSerializer(serializers.ModelSerializer):
         return data
 
     def get_is_subscribed(self, obj):
-        if not obj.user:
-            return False
-        return obj.user.subscriptions.filter(author=obj.author).exists()
-
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        recipes_limit = self.context['request'].GET.get('recipes_limit')
-        if recipes_limit:
-            representation['recipes'] = representation[
-                'recipes'
-            ][:int(recipes_limit)]
-        return representation
+        return True
+
+    def get_recipes(self, obj):
+        recipes = getattr(obj.author, 'limited_recipes', None)
+        if recipes is None:
+            recipes = obj.author.recipe.all()
+            recipes_limit = get_recipes_limit(self.context['request'])
+            if recipes_limit:
+                recipes = recipes[:recipes_limit]
+        return RecipeMiniSerializer(
+            recipes, many=True, context=self.context
+        ).data
 
     def get_recipes_count(self, obj):
-        return obj.author.recipe.count()
+        return obj.author.recipes_count
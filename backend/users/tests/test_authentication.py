@@ -0,0 +1,65 @@
+from time import monotonic
+from unittest import mock
+
+from django.conf import settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from api.tests.base import APITestBase
+from users.authentication import token_cache_stats
+
+PASSWORD = 'pw-123456!'
+
+
+class CachingTokenAuthenticationTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def me(self):
+        return self.client.get(reverse('api:users-current_user'))
+
+    def test_cached_token_skips_the_database(self):
+        self.assertEqual(self.me().status_code, 200)
+        hits = token_cache_stats.local_hits
+        with self.assertNumQueries(0):
+            self.assertEqual(self.me().status_code, 200)
+        self.assertEqual(token_cache_stats.local_hits, hits + 1)
+
+    def test_deleted_token_is_rejected(self):
+        self.me()
+        self.token.delete()
+        self.assertEqual(self.me().status_code, 401)
+
+    def test_logout_is_rejected(self):
+        self.me()
+        self.client.post(reverse('api:logout'))
+        self.assertEqual(self.me().status_code, 401)
+
+    def test_password_change_is_rejected(self):
+        self.me()
+        response = self.client.post(
+            reverse('api:users-set_new_password'),
+            {'current_password': PASSWORD, 'new_password': 'pw-654321!'}
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.me().status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        self.me()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.me().status_code, 401)
+
+    def test_other_process_rejects_after_ttl(self):
+        self.me()
+        # Сигналы срабатывают только в процессе, который удалил токен:
+        # в остальных запись в памяти живёт до истечения TTL.
+        with mock.patch('api.signals.forget_token'):
+            self.token.delete()
+        self.assertEqual(self.me().status_code, 200)
+        expired = monotonic() + settings.AUTH_TOKEN_CACHE_TTL + 1
+        with mock.patch('api.caches.monotonic', return_value=expired):
+            self.assertEqual(self.me().status_code, 401)
@@ -1,11 +1,18 @@
+from djoser.conf import settings as djoser_settings
+from djoser.utils import logout_user
 from djoser.views import UserViewSet as BaseUserViewSet
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Prefetch, Window
+from django.db.models.functions import RowNumber
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 
-from api.models import Subscription
+from api.constants import USER_THROTTLE_COSTS
+from api.mixins import ReplicaReadMixin
+from api.models import Recipe, Subscription
 from api.pagination import LimitPagination
 from users.serializers import (
     SignUpSerializer,
@@ -13,16 +20,18 @@ from users.serializers import (
     UserProfileSerializer,
     SetPasswordSerializer,
     SubscribeSerializer,
+    get_recipes_limit,
 )
 
 
 User = get_user_model()
 
 
-class UsersViewSet(BaseUserViewSet):
+class UsersViewSet(ReplicaReadMixin, BaseUserViewSet):
     queryset = User.objects.all()
     pagination_class = LimitPagination
     permission_classes = (permissions.AllowAny,)
+    throttle_costs = USER_THROTTLE_COSTS
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -87,6 +96,8 @@ class UsersViewSet(BaseUserViewSet):
             instance=self.request.user,
             validated_data=serializer.validated_data
         )
+        if djoser_settings.LOGOUT_ON_PASSWORD_CHANGE:
+            logout_user(request)
         return Response(
             status=status.HTTP_204_NO_CONTENT
         )
@@ -114,7 +125,8 @@ class UsersViewSet(BaseUserViewSet):
                 }
             )
             serializer.is_valid(raise_exception=True)
-            serializer.save(user=user, author=author)
+            with transaction.atomic():
+                serializer.save(user=user, author=author)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         if is_subscription_exist:
@@ -135,7 +147,7 @@ class UsersViewSet(BaseUserViewSet):
     )
     def subscriptions(self, request):
         paginate_subs = self.paginate_queryset(
-            Subscription.objects.filter(user=self.request.user)
+            self.get_subscriptions_queryset(get_recipes_limit(request))
         )
         serializer = SubscribeSerializer(
             paginate_subs,
@@ -143,3 +155,22 @@ class UsersViewSet(BaseUserViewSet):
             context={'request': request}
         )
         return self.get_paginated_response(serializer.data)
+
+    def get_subscriptions_queryset(self, recipes_limit):
+        recipes = Recipe.objects.only(
+            'id', 'name', 'image', 'image_renditions', 'cooking_time',
+            'author_id', 'pub_date'
+        )
+        if recipes_limit:
+            recipes = recipes.annotate(
+                row_number=Window(
+                    RowNumber(),
+                    partition_by=F('author'),
+                    order_by=(F('pub_date').desc(), F('id').desc())
+                )
+            ).filter(row_number__lte=recipes_limit)
+        return Subscription.objects.filter(
+            user=self.request.user
+        ).select_related('author').prefetch_related(
+            Prefetch('author__recipe', recipes, to_attr='limited_recipes')
+        ).order_by('pk')